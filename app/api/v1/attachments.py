@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.schemas.schemas import AttachmentResponse
 from app.services.services import AttachmentService
 from app.core.deps import get_current_active_user
+from app.core.pagination import get_cursor, NEXT_CURSOR_HEADER
 from app.db.models import User
 import os
 import uuid
@@ -62,12 +63,16 @@ async def list_attachments(
     memo_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[list] = Depends(get_cursor),
+    response: Response = None,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     attachment_service = AttachmentService(db)
-    attachments = await attachment_service.list_attachments(memo_id=memo_id, skip=skip, limit=limit)
-    return attachments
+    page = await attachment_service.list_attachments(memo_id=memo_id, skip=skip, limit=limit, cursor=cursor)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
 
 
 @router.get("/attachments/{attachment_id}", response_model=AttachmentResponse)
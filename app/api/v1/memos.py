@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.db.session import get_db
-from app.schemas.schemas import MemoCreate, MemoUpdate, MemoResponse
-from app.services.services import MemoService
+from app.db.session import AsyncReadSessionLocal, get_db, get_read_db
+from app.schemas.schemas import MemoCreate, MemoUpdate, MemoResponse, MemoRendered, MemoRenderResponse, MemoBatchRenderRequest, MemoImportResponse
+from app.services.services import ExportService, MemoService
 from app.core.deps import get_current_active_user, get_current_user_optional
+from app.core.pagination import get_cursor, NEXT_CURSOR_HEADER
+from app.core.jsonstream import iter_json_array, iter_ndjson
+from app.core.archive import ArchiveWriter
 from app.db.models import User, MemoVisibility
+from app.config import settings
+from datetime import datetime, timezone
+import json
 
 router = APIRouter()
 
@@ -21,16 +28,44 @@ async def create_memo(
     return db_memo
 
 
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+@router.post("/memos/import", response_model=MemoImportResponse)
+async def import_memos(
+    request: Request,
+    new_uids: bool = Query(False),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_CONTENT_TYPES:
+        items = iter_ndjson(request.stream())
+    elif content_type == "application/json":
+        items = iter_json_array(request.stream())
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send memos as NDJSON (application/x-ndjson) or a JSON array (application/json)"
+        )
+    
+    memo_service = MemoService(db)
+    return await memo_service.import_memos(items, current_user.id, new_uids=new_uids)
+
+
 @router.get("/memos", response_model=List[MemoResponse])
 async def list_memos(
     creator_id: Optional[int] = Query(None),
     visibility: Optional[str] = Query(None),
     tag: Optional[str] = Query(None),
     pinned: Optional[bool] = Query(None),
+    render: bool = Query(False),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[list] = Depends(get_cursor),
+    response: Response = None,
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     memo_service = MemoService(db)
     
@@ -39,25 +74,59 @@ async def list_memos(
     elif not creator_id:
         creator_id = current_user.id
     
-    memos = await memo_service.list_memos(
+    page = await memo_service.list_memos(
         creator_id=creator_id,
         visibility=visibility,
         tag=tag,
         pinned=pinned,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        viewer_id=current_user.id if current_user else None
     )
     
-    filtered_memos = []
-    for memo in memos:
-        if memo.visibility == MemoVisibility.PUBLIC:
-            filtered_memos.append(memo)
-        elif memo.visibility == MemoVisibility.PROTECTED and current_user:
-            filtered_memos.append(memo)
-        elif memo.visibility == MemoVisibility.PRIVATE and current_user and memo.creator_id == current_user.id:
-            filtered_memos.append(memo)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    
+    if render:
+        rendered = await memo_service.get_rendered(page.items)
+        return [
+            MemoResponse.model_validate(memo).model_copy(
+                update={"rendered": MemoRendered(html=r["html"], preview=r["preview"])}
+            )
+            for memo, r in zip(page.items, rendered)
+        ]
+    
+    return page.items
+
+
+@router.get("/memos/export")
+async def export_memos(
+    format: str = Query("ndjson", pattern="^(ndjson|tar|zip)$"),
+    current_user: User = Depends(get_current_active_user)
+):
+    creator_id = current_user.id
+    archive = ArchiveWriter(format) if format != "ndjson" else None
+    
+    # The response outlives the request's dependencies, so the export reads through
+    # a session of its own that stays open until the last byte is sent.
+    async def stream():
+        async with AsyncReadSessionLocal() as db:
+            export_service = ExportService(db)
+            if archive is None:
+                async for lines in export_service.export_ndjson(creator_id):
+                    yield lines
+            else:
+                async for chunk in export_service.export_archive(creator_id, archive):
+                    if chunk:
+                        yield chunk
     
-    return filtered_memos
+    filename = f"memos-{datetime.now(timezone.utc):%Y%m%d}.{format}"
+    return StreamingResponse(
+        stream(),
+        media_type=archive.media_type if archive else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 @router.get("/memos/{memo_id}", response_model=MemoResponse)
@@ -91,6 +160,65 @@ async def get_memo(
     return memo
 
 
+@router.get("/memos/{memo_id}/render", response_model=MemoRenderResponse)
+async def render_memo(
+    memo_id: int,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_db)
+):
+    memo_service = MemoService(db)
+    memo = await memo_service.get_memo_by_id(memo_id)
+    
+    if not memo:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Memo not found"
+        )
+    
+    if memo.visibility == MemoVisibility.PRIVATE:
+        if not current_user or memo.creator_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied"
+            )
+    elif memo.visibility == MemoVisibility.PROTECTED:
+        if not current_user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Authentication required"
+            )
+    
+    rendered = (await memo_service.get_rendered([memo]))[0]
+    return MemoRenderResponse(id=memo.id, html=rendered["html"], preview=rendered["preview"])
+
+
+@router.post("/memos/render")
+async def render_memos(
+    render_request: MemoBatchRenderRequest,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_db)
+):
+    if len(render_request.memo_ids) > settings.RENDER_BATCH_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.RENDER_BATCH_MAX} memos can be rendered at once"
+        )
+    
+    memo_service = MemoService(db)
+    memos = await memo_service.get_memos_by_ids(
+        render_request.memo_ids,
+        viewer_id=current_user.id if current_user else None
+    )
+    memos_by_id = {memo.id: memo for memo in memos}
+    ordered = [memos_by_id[memo_id] for memo_id in dict.fromkeys(render_request.memo_ids) if memo_id in memos_by_id]
+    
+    async def stream():
+        async for rendered in memo_service.render_memos(ordered):
+            yield json.dumps(rendered) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @router.get("/memos/uid/{uid}", response_model=MemoResponse)
 async def get_memo_by_uid(
     uid: str,
@@ -130,7 +258,9 @@ async def update_memo(
     db: AsyncSession = Depends(get_db)
 ):
     memo_service = MemoService(db)
-    memo = await memo_service.get_memo_by_id(memo_id)
+    # The creator is the current user, who is already in the session, so the response
+    # can resolve memo.creator without loading it.
+    memo = await memo_service.get_memo_by_id(memo_id, with_creator=False)
     
     if not memo:
         raise HTTPException(
@@ -144,7 +274,7 @@ async def update_memo(
             detail="You can only update your own memos"
         )
     
-    updated_memo = await memo_service.update_memo(memo_id, memo_data)
+    updated_memo = await memo_service.update_memo(memo_id, memo_data, memo=memo)
     return updated_memo
 
 
@@ -155,18 +285,17 @@ async def delete_memo(
     db: AsyncSession = Depends(get_db)
 ):
     memo_service = MemoService(db)
-    memo = await memo_service.get_memo_by_id(memo_id)
+    if await memo_service.delete_memo(memo_id, creator_id=current_user.id):
+        return
     
+    memo = await memo_service.get_memo_by_id(memo_id, with_creator=False)
     if not memo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Memo not found"
         )
     
-    if memo.creator_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You can only delete your own memos"
-        )
-    
-    await memo_service.delete_memo(memo_id)
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="You can only delete your own memos"
+    )
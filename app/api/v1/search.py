@@ -1,13 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
-from app.db.session import get_db
-from app.schemas.schemas import MemoResponse
-from app.db.models import Memo, MemoVisibility, User
+from sqlalchemy import select, and_
+from sqlalchemy.orm import selectinload, defer
+from typing import List, Optional, Union
+from app.db.session import get_read_db
+from app.schemas.schemas import MemoResponse, MemoSnippetResponse, MatchSpan
+from app.db.models import Memo, User, UserRole
+from app.db.fulltext import fulltext_index
+from app.db.trigram import fuzzy_index
+from app.services.filters import TAG_TIMELINE_KEYS, join_tag, visibility_filter
+from app.services.services import MemoStatsService, MEMO_TIMELINE_KEYS
+from app.core.pagination import Page, paginate, get_cursor, InvalidCursorError, NEXT_CURSOR_HEADER
 from app.core.deps import get_current_active_user, get_current_user_optional
-import re
+from app.core.filter_expr import compile_filter, FilterSyntaxError
+from app.core.highlight import search_terms, find_matches, build_snippet
+from app.core.cache import query_cache
+from datetime import datetime
 
 router = APIRouter()
 
@@ -23,15 +32,44 @@ class SearchService:
         visibility: Optional[str] = None,
         tag: Optional[str] = None,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[Memo]:
-        db_query = select(Memo).options(selectinload(Memo.creator))
+        limit: int = 100,
+        cursor: Optional[list] = None,
+        viewer_id: Optional[int] = None,
+        with_creator: bool = True,
+        fuzzy: bool = False
+    ) -> Page:
+        if with_creator:
+            db_query = select(Memo).options(selectinload(Memo.creator))
+        else:
+            db_query = select(Memo).options(defer(Memo.payload))
+        keys = MEMO_TIMELINE_KEYS
+        
+        conditions = [visibility_filter(viewer_id)]
         
-        conditions = []
+        fuzzy_match = None
+        if fuzzy and query:
+            after = None
+            if cursor is not None:
+                if len(cursor) != 2 or not isinstance(cursor[0], (int, float)) or not isinstance(cursor[1], int):
+                    raise InvalidCursorError("Invalid cursor")
+                after = (cursor[0], cursor[1])
+            fuzzy_match = await fuzzy_index.match(
+                self.db, query, skip + limit + 1, viewer_id=viewer_id, creator_id=creator_id,
+                visibility=visibility, tag=tag, after=after
+            )
         
-        if query:
-            search_pattern = f"%{query}%"
-            conditions.append(Memo.content.ilike(search_pattern))
+        if fuzzy_match is not None:
+            condition, score = fuzzy_match
+            conditions.append(condition)
+            keys = [(score, True), (Memo.id, True)]
+        elif query:
+            match = fulltext_index.match(self.db, query)
+            if match is not None:
+                db_query = db_query.join(match, match.c.memo_id == Memo.id)
+                keys = [(match.c.rank, False)] + MEMO_TIMELINE_KEYS
+            else:
+                search_pattern = f"%{query}%"
+                conditions.append(Memo.content.ilike(search_pattern))
         
         if creator_id:
             conditions.append(Memo.creator_id == creator_id)
@@ -40,14 +78,14 @@ class SearchService:
             conditions.append(Memo.visibility == visibility)
         
         if tag:
-            conditions.append(Memo.tags.contains([tag]))
+            db_query = join_tag(db_query, tag, creator_id)
+            if keys is MEMO_TIMELINE_KEYS:
+                keys = TAG_TIMELINE_KEYS
         
         if conditions:
             db_query = db_query.where(and_(*conditions))
         
-        db_query = db_query.order_by(Memo.created_ts.desc()).offset(skip).limit(limit)
-        result = await self.db.execute(db_query)
-        return result.scalars().all()
+        return await paginate(self.db, db_query, keys, cursor=cursor, skip=skip, limit=limit)
     
     async def filter_memos(
         self,
@@ -58,12 +96,15 @@ class SearchService:
         content_contains: Optional[str] = None,
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
+        filter_expr: Optional[str] = None,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[Memo]:
+        limit: int = 100,
+        cursor: Optional[list] = None,
+        viewer_id: Optional[int] = None
+    ) -> Page:
         db_query = select(Memo).options(selectinload(Memo.creator))
         
-        conditions = []
+        conditions = [visibility_filter(viewer_id)]
         
         if creator_id:
             conditions.append(Memo.creator_id == creator_id)
@@ -71,8 +112,10 @@ class SearchService:
         if visibility:
             conditions.append(Memo.visibility == visibility)
         
+        keys = MEMO_TIMELINE_KEYS
         if tag:
-            conditions.append(Memo.tags.contains([tag]))
+            db_query = join_tag(db_query, tag, creator_id)
+            keys = TAG_TIMELINE_KEYS
         
         if pinned is not None:
             conditions.append(Memo.pinned == pinned)
@@ -81,86 +124,61 @@ class SearchService:
             conditions.append(Memo.content.ilike(f"%{content_contains}%"))
         
         if date_from:
-            from datetime import datetime
-            try:
-                dt_from = datetime.fromisoformat(date_from)
-                conditions.append(Memo.created_ts >= dt_from)
-            except ValueError:
-                pass
+            conditions.append(Memo.created_ts >= datetime.fromisoformat(date_from))
         
         if date_to:
-            from datetime import datetime
-            try:
-                dt_to = datetime.fromisoformat(date_to)
-                conditions.append(Memo.created_ts <= dt_to)
-            except ValueError:
-                pass
+            conditions.append(Memo.created_ts <= datetime.fromisoformat(date_to))
+        
+        if filter_expr:
+            conditions.append(compile_filter(filter_expr))
         
         if conditions:
             db_query = db_query.where(and_(*conditions))
         
-        db_query = db_query.order_by(Memo.created_ts.desc()).offset(skip).limit(limit)
-        result = await self.db.execute(db_query)
-        return result.scalars().all()
+        return await paginate(self.db, db_query, keys, cursor=cursor, skip=skip, limit=limit)
     
-    async def get_all_tags(self, creator_id: Optional[int] = None) -> List[str]:
-        db_query = select(Memo)
-        
-        if creator_id:
-            db_query = db_query.where(Memo.creator_id == creator_id)
-        
-        result = await self.db.execute(db_query)
-        memos = result.scalars().all()
-        
-        all_tags = set()
+    def build_snippets(self, memos: List[Memo], query: str, window: int = 160) -> List[MemoSnippetResponse]:
+        terms = search_terms(query)
+        snippets = []
         for memo in memos:
-            if memo.tags:
-                all_tags.update(memo.tags)
-        
-        return sorted(list(all_tags))
+            matches = find_matches(memo.content, terms)
+            snippets.append(MemoSnippetResponse(
+                id=memo.id,
+                uid=memo.uid,
+                creator_id=memo.creator_id,
+                visibility=memo.visibility,
+                tags=memo.tags,
+                pinned=memo.pinned,
+                created_ts=memo.created_ts,
+                updated_ts=memo.updated_ts,
+                content_length=len(memo.content),
+                snippet=build_snippet(memo.content, matches, window),
+                matches=[MatchSpan(start=start, end=end) for start, end in matches]
+            ))
+        return snippets
+    
+    async def get_all_tags(self, creator_id: Optional[int] = None) -> List[str]:
+        return await MemoStatsService(self.db).get_tags(creator_id)
     
     async def get_memo_stats(self, creator_id: Optional[int] = None) -> dict:
-        from sqlalchemy import func
-        
-        db_query = select(Memo)
-        
-        if creator_id:
-            db_query = db_query.where(Memo.creator_id == creator_id)
-        
-        result = await self.db.execute(db_query)
-        memos = result.scalars().all()
-        
-        total_memos = len(memos)
-        pinned_memos = sum(1 for m in memos if m.pinned)
-        
-        visibility_counts = {}
-        for v in MemoVisibility:
-            visibility_counts[v.value] = sum(1 for m in memos if m.visibility == v)
-        
-        all_tags = set()
-        for memo in memos:
-            if memo.tags:
-                all_tags.update(memo.tags)
-        
-        return {
-            "total_memos": total_memos,
-            "pinned_memos": pinned_memos,
-            "visibility_counts": visibility_counts,
-            "total_tags": len(all_tags),
-            "unique_tags": sorted(list(all_tags))
-        }
+        return await MemoStatsService(self.db).get_stats(creator_id)
 
 
-@router.get("/search/memos", response_model=List[MemoResponse])
+@router.get("/search/memos", response_model=Union[List[MemoResponse], List[MemoSnippetResponse]])
 async def search_memos(
     query: str = Query(..., min_length=1),
     creator_id: Optional[int] = Query(None),
     visibility: Optional[str] = Query(None),
     tag: Optional[str] = Query(None),
+    fuzzy: bool = Query(False),
+    snippet: bool = Query(False),
+    snippet_length: int = Query(160, ge=40, le=1000),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[list] = Depends(get_cursor),
+    response: Response = None,
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     search_service = SearchService(db)
     
@@ -169,25 +187,39 @@ async def search_memos(
     elif not creator_id:
         creator_id = current_user.id
     
-    memos = await search_service.search_memos(
-        query=query,
-        creator_id=creator_id,
-        visibility=visibility,
-        tag=tag,
-        skip=skip,
-        limit=limit
+    viewer_id = current_user.id if current_user else None
+    cache_key = query_cache.make_key(
+        "search", viewer_id, query=query, creator_id=creator_id, visibility=visibility, tag=tag,
+        fuzzy=fuzzy, snippet=snippet, snippet_length=snippet_length if snippet else None,
+        skip=skip, limit=limit, cursor=cursor
     )
+    cached = await query_cache.get(cache_key)
+    
+    if cached is None:
+        page = await search_service.search_memos(
+            query=query,
+            creator_id=creator_id,
+            visibility=visibility,
+            tag=tag,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            viewer_id=viewer_id,
+            with_creator=not snippet,
+            fuzzy=fuzzy
+        )
+        if snippet:
+            items = jsonable_encoder(search_service.build_snippets(page.items, query, snippet_length))
+        else:
+            items = jsonable_encoder([MemoResponse.model_validate(memo) for memo in page.items])
+        cached = (items, page.next_cursor)
+        await query_cache.set(cache_key, cached, creator_id)
     
-    filtered_memos = []
-    for memo in memos:
-        if memo.visibility == MemoVisibility.PUBLIC:
-            filtered_memos.append(memo)
-        elif memo.visibility == MemoVisibility.PROTECTED and current_user:
-            filtered_memos.append(memo)
-        elif memo.visibility == MemoVisibility.PRIVATE and current_user and memo.creator_id == current_user.id:
-            filtered_memos.append(memo)
+    items, next_cursor = cached
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
-    return filtered_memos
+    return items
 
 
 @router.get("/filter/memos", response_model=List[MemoResponse])
@@ -199,10 +231,13 @@ async def filter_memos(
     content_contains: Optional[str] = Query(None),
     date_from: Optional[str] = Query(None),
     date_to: Optional[str] = Query(None),
+    filter_expr: Optional[str] = Query(None, alias="filter"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[list] = Depends(get_cursor),
+    response: Response = None,
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     search_service = SearchService(db)
     
@@ -211,35 +246,55 @@ async def filter_memos(
     elif not creator_id:
         creator_id = current_user.id
     
-    memos = await search_service.filter_memos(
-        creator_id=creator_id,
-        visibility=visibility,
-        tag=tag,
-        pinned=pinned,
-        content_contains=content_contains,
-        date_from=date_from,
-        date_to=date_to,
-        skip=skip,
-        limit=limit
+    viewer_id = current_user.id if current_user else None
+    cache_key = query_cache.make_key(
+        "filter", viewer_id, creator_id=creator_id, visibility=visibility, tag=tag, pinned=pinned,
+        content_contains=content_contains, date_from=date_from, date_to=date_to,
+        filter=filter_expr.strip() if filter_expr else None, skip=skip, limit=limit, cursor=cursor
     )
+    cached = await query_cache.get(cache_key)
+    
+    if cached is None:
+        try:
+            page = await search_service.filter_memos(
+                creator_id=creator_id,
+                visibility=visibility,
+                tag=tag,
+                pinned=pinned,
+                content_contains=content_contains,
+                date_from=date_from,
+                date_to=date_to,
+                filter_expr=filter_expr,
+                skip=skip,
+                limit=limit,
+                cursor=cursor,
+                viewer_id=viewer_id
+            )
+        except FilterSyntaxError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid filter: {e}"
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid date, expected ISO 8601 format"
+            )
+        cached = (jsonable_encoder([MemoResponse.model_validate(memo) for memo in page.items]), page.next_cursor)
+        await query_cache.set(cache_key, cached, creator_id)
     
-    filtered_memos = []
-    for memo in memos:
-        if memo.visibility == MemoVisibility.PUBLIC:
-            filtered_memos.append(memo)
-        elif memo.visibility == MemoVisibility.PROTECTED and current_user:
-            filtered_memos.append(memo)
-        elif memo.visibility == MemoVisibility.PRIVATE and current_user and memo.creator_id == current_user.id:
-            filtered_memos.append(memo)
+    items, next_cursor = cached
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
-    return filtered_memos
+    return items
 
 
 @router.get("/tags")
 async def get_tags(
     creator_id: Optional[int] = Query(None),
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     search_service = SearchService(db)
     
@@ -250,11 +305,22 @@ async def get_tags(
     return {"tags": tags}
 
 
+@router.get("/tags/suggest")
+async def suggest_tags(
+    prefix: str = Query("", max_length=255),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    tags = await MemoStatsService(db).suggest_tags(current_user.id, prefix.lstrip("#"), limit)
+    return {"tags": tags}
+
+
 @router.get("/stats")
 async def get_stats(
     creator_id: Optional[int] = Query(None),
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     search_service = SearchService(db)
     
@@ -263,3 +329,15 @@ async def get_stats(
     
     stats = await search_service.get_memo_stats(creator_id=creator_id)
     return stats
+
+
+@router.get("/search/cache/stats")
+async def get_search_cache_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.role not in (UserRole.HOST, UserRole.ADMIN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return query_cache.stats()
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from app.db.session import get_db
-from app.schemas.schemas import PersonalAccessTokenCreate, PersonalAccessTokenResponse
+from app.schemas.schemas import PersonalAccessTokenCreate, PersonalAccessTokenResponse, PersonalAccessTokenCreateResponse
 from app.services.services import PersonalAccessTokenService
 from app.core.deps import get_current_active_user
 from app.core.security import generate_pat_token
@@ -11,7 +11,7 @@ from app.db.models import User
 router = APIRouter()
 
 
-@router.post("/tokens", response_model=PersonalAccessTokenResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/tokens", response_model=PersonalAccessTokenCreateResponse, status_code=status.HTTP_201_CREATED)
 async def create_pat(
     pat_data: PersonalAccessTokenCreate,
     current_user: User = Depends(get_current_active_user),
@@ -20,7 +20,10 @@ async def create_pat(
     pat_service = PersonalAccessTokenService(db)
     token = generate_pat_token()
     db_pat = await pat_service.create_pat(pat_data, current_user.id, token)
-    return db_pat
+    return PersonalAccessTokenCreateResponse(
+        **PersonalAccessTokenResponse.model_validate(db_pat).model_dump(),
+        token=token
+    )
 
 
 @router.get("/tokens", response_model=List[PersonalAccessTokenResponse])
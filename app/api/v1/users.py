@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.schemas.schemas import UserCreate, UserResponse, UserUpdate, Token
 from app.services.services import UserService
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import password_hasher, create_access_token
 from app.core.deps import get_current_active_user
-from app.db.models import User
-from typing import List
+from app.core.pagination import get_cursor, NEXT_CURSOR_HEADER
+from app.core.ratelimit import rate_limiter, admission_controller
+from app.db.models import User, UserRole
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -29,7 +31,7 @@ async def signup(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
             detail="Username already taken"
         )
     
-    password_hash = get_password_hash(user_data.password)
+    password_hash = await password_hasher.hash(user_data.password)
     db_user = await user_service.create_user(user_data, password_hash)
     
     return db_user
@@ -40,13 +42,17 @@ async def signin(email: str, password: str, db: AsyncSession = Depends(get_db)):
     user_service = UserService(db)
     
     user = await user_service.get_user_by_email(email)
-    if not user or not verify_password(password, user.password_hash):
+    verified, new_hash = await password_hasher.verify_and_update(password, user.password_hash) if user else (False, None)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    if new_hash:
+        await user_service.update_password_hash(user, new_hash)
+    
     access_token = create_access_token(data={"sub": str(user.id)})
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -72,16 +78,44 @@ async def update_current_user(
     return updated_user
 
 
+@router.get("/auth/hasher/stats")
+async def get_password_hasher_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.role not in (UserRole.HOST, UserRole.ADMIN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return password_hasher.stats()
+
+
+@router.get("/auth/ratelimit/stats")
+async def get_rate_limit_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.role not in (UserRole.HOST, UserRole.ADMIN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return {"rate_limit": rate_limiter.stats(), "admission": admission_controller.stats()}
+
+
 @router.get("/users", response_model=List[UserResponse])
 async def list_users(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[list] = Depends(get_cursor),
+    response: Response = None,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     user_service = UserService(db)
-    users = await user_service.list_users(skip=skip, limit=limit)
-    return users
+    page = await user_service.list_users(skip=skip, limit=limit, cursor=cursor)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
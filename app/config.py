@@ -13,10 +13,88 @@ class Settings(BaseSettings):
     DATA_DIR: str = "./data"
     
     DATABASE_URL: str = "sqlite+aiosqlite:///./data/memos.db"
+    DATABASE_READ_URL: Optional[str] = None
+    
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    
+    SQLITE_WAL: bool = True
+    SQLITE_BUSY_TIMEOUT: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    
+    GROUP_COMMIT_ENABLED: bool = False
+    GROUP_COMMIT_WINDOW_MS: float = 5
+    GROUP_COMMIT_MAX_BATCH: int = 100
+    
+    IMPORT_CHUNK_SIZE: int = 500
+    IMPORT_MAX_ERRORS: int = 1000
+    EXPORT_BATCH_SIZE: int = 500
+    EXPORT_SPOOL_MAX_BYTES: int = 8 * 1024 * 1024
+    
+    FULLTEXT_SEARCH: bool = True
+    
+    # Outside PostgreSQL the fuzzy index lives in process memory and is not shared: every
+    # worker holds its own copy, and memos written by another worker become searchable
+    # only after its next refresh, up to FUZZY_INDEX_REFRESH_SECONDS later. The index is
+    # saved to FUZZY_INDEX_PATH every FUZZY_INDEX_SAVE_SECONDS and on shutdown.
+    FUZZY_SEARCH: bool = True
+    FUZZY_SIMILARITY_THRESHOLD: float = 0.3
+    FUZZY_MAX_CANDIDATES: int = 500
+    FUZZY_MAX_POSTINGS: int = 20000
+    FUZZY_INDEX_PATH: Optional[str] = None
+    FUZZY_INDEX_REFRESH_SECONDS: float = 5
+    FUZZY_INDEX_SAVE_SECONDS: float = 300
+    
+    QUERY_CACHE_ENABLED: bool = True
+    QUERY_CACHE_BACKEND: str = "memory"
+    QUERY_CACHE_MAX_ENTRIES: int = 1024
+    QUERY_CACHE_TTL: float = 30
+    
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_BACKEND: str = "memory"
+    USER_CACHE_MAX_ENTRIES: int = 4096
+    USER_CACHE_TTL: float = 10
+    
+    PAT_CACHE_ENABLED: bool = True
+    PAT_CACHE_BACKEND: str = "memory"
+    PAT_CACHE_MAX_ENTRIES: int = 4096
+    PAT_CACHE_TTL: float = 60
+    
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    
+    RENDER_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    RENDER_WORKERS: int = 0
+    RENDER_CHUNK_SIZE: int = 32
+    RENDER_INLINE_THRESHOLD: int = 8
+    RENDER_BATCH_MAX: int = 500
+    BLOCK_RENDER_MIN_LENGTH: int = 8192
     
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMITS: dict = {
+        "default": "600/minute",
+        "POST /api/v1/auth/signin": "10/minute",
+        "POST /api/v1/auth/signup": "5/minute",
+        "GET /api/v1/search/memos": "120/minute",
+        "GET /api/v1/filter/memos": "120/minute",
+        "POST /api/v1/memos/import": "6/minute",
+        "GET /api/v1/memos/export": "6/minute",
+    }
+    MAX_IN_FLIGHT_REQUESTS: int = 512
+    DB_POOL_WAIT_THRESHOLD: float = 1.0
+    
     CORS_ORIGINS: list = ["http://localhost:5173", "http://localhost:3000"]
     
     SMTP_HOST: Optional[str] = None
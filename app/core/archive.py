@@ -0,0 +1,90 @@
+from typing import AsyncIterator, BinaryIO, List
+from starlette.concurrency import run_in_threadpool
+import io
+import tarfile
+import time
+import zipfile
+
+ARCHIVE_MEDIA_TYPES = {"tar": "application/x-tar", "zip": "application/zip"}
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+class ChunkBuffer(io.RawIOBase):
+    # Collects what the zip writer produces until the caller drains it, so the
+    # archive is sent as it is written instead of being assembled in memory.
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self.position
+    
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def read_chunks(fileobj: BinaryIO, size: int) -> AsyncIterator[bytes]:
+    remaining = size
+    while remaining > 0:
+        chunk = await run_in_threadpool(fileobj.read, min(COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
+    if remaining > 0:
+        # The file shrank after its size was recorded; pad it so the archive stays valid.
+        yield b"\0" * remaining
+
+
+class ArchiveWriter:
+    def __init__(self, archive_format: str):
+        if archive_format not in ARCHIVE_MEDIA_TYPES:
+            raise ValueError(f"Unknown archive format: {archive_format}")
+        self.archive_format = archive_format
+        self.media_type = ARCHIVE_MEDIA_TYPES[archive_format]
+        self.written = 0
+        self.buffer = ChunkBuffer()
+        self.zip = zipfile.ZipFile(self.buffer, "w") if archive_format == "zip" else None
+    
+    async def add_file(self, name: str, fileobj: BinaryIO, size: int, mtime: float, compress: bool = False) -> AsyncIterator[bytes]:
+        if self.zip is not None:
+            info = zipfile.ZipInfo(name, date_time=time.localtime(max(mtime, 315619200))[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+            info.file_size = size
+            with self.zip.open(info, "w") as member:
+                async for chunk in read_chunks(fileobj, size):
+                    member.write(chunk)
+                    yield self.buffer.drain()
+            yield self.buffer.drain()
+            return
+        
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = int(mtime)
+        info.mode = 0o644
+        header = info.tobuf(format=tarfile.PAX_FORMAT)
+        self.written += len(header) + size
+        yield header
+        async for chunk in read_chunks(fileobj, size):
+            yield chunk
+        padding = -size % tarfile.BLOCKSIZE
+        if padding:
+            self.written += padding
+            yield b"\0" * padding
+    
+    def close(self) -> bytes:
+        if self.zip is not None:
+            self.zip.close()
+            return self.buffer.drain()
+        end = b"\0" * (tarfile.BLOCKSIZE * 2)
+        return end + b"\0" * (-(self.written + len(end)) % tarfile.RECORDSIZE)
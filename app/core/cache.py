@@ -0,0 +1,201 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from app.config import settings
+import json
+import time
+
+ANY_CREATOR = "*"
+
+
+class CacheBackend:
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+    
+    async def set(self, key: str, value: Any, tags: Iterable[str], ttl: Optional[float] = None):
+        raise NotImplementedError
+    
+    async def invalidate_tags(self, tags: Iterable[str]):
+        raise NotImplementedError
+    
+    async def clear(self):
+        raise NotImplementedError
+    
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    def __init__(self, max_entries: int = 1024, ttl: float = 30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, Tuple[float, Any, Set[str]]]" = OrderedDict()
+        self.tag_keys: Dict[str, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    async def set(self, key: str, value: Any, tags: Iterable[str], ttl: Optional[float] = None):
+        self._remove(key)
+        tag_set = set(tags)
+        self.entries[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value, tag_set)
+        for tag in tag_set:
+            self.tag_keys.setdefault(tag, set()).add(key)
+        while len(self.entries) > self.max_entries:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+    
+    async def invalidate_tags(self, tags: Iterable[str]):
+        for tag in tags:
+            for key in self.tag_keys.pop(tag, set()):
+                if self._remove(key):
+                    self.invalidations += 1
+    
+    async def clear(self):
+        self.entries.clear()
+        self.tag_keys.clear()
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+    
+    def _remove(self, key: str) -> bool:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+        for tag in entry[2]:
+            keys = self.tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tag_keys[tag]
+        return True
+
+
+class QueryCache:
+    def __init__(self, backend: CacheBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+    
+    def make_key(self, namespace: str, viewer_id: Optional[int], **params) -> str:
+        normalized = {name: value for name, value in params.items() if value is not None}
+        return json.dumps([namespace, viewer_id, normalized], sort_keys=True, separators=(",", ":"), default=str)
+    
+    def creator_tags(self, creator_id: Optional[int]) -> list:
+        return [f"creator:{creator_id}" if creator_id else f"creator:{ANY_CREATOR}"]
+    
+    async def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        return await self.backend.get(key)
+    
+    async def set(self, key: str, value: Any, creator_id: Optional[int] = None):
+        if not self.enabled:
+            return
+        await self.backend.set(key, value, self.creator_tags(creator_id))
+    
+    async def invalidate_creator(self, creator_id: int):
+        if not self.enabled:
+            return
+        # Results that were not scoped to a single creator may include this creator's memos.
+        await self.backend.invalidate_tags([f"creator:{creator_id}", f"creator:{ANY_CREATOR}"])
+    
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, **self.backend.stats()}
+
+
+class UserCache:
+    def __init__(self, backend: CacheBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+    
+    async def get(self, user_id: int) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        return await self.backend.get(f"user:{user_id}")
+    
+    async def set(self, user_id: int, snapshot: dict):
+        if not self.enabled:
+            return
+        await self.backend.set(f"user:{user_id}", snapshot, [f"user:{user_id}"])
+    
+    async def invalidate(self, user_id: int):
+        if not self.enabled:
+            return
+        await self.backend.invalidate_tags([f"user:{user_id}"])
+    
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, **self.backend.stats()}
+
+
+class PatCache:
+    def __init__(self, backend: CacheBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+    
+    async def get(self, token_hash: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        return await self.backend.get(f"pat:{token_hash}")
+    
+    async def set(self, token_hash: str, entry: dict, ttl: Optional[float] = None):
+        if not self.enabled:
+            return
+        await self.backend.set(
+            f"pat:{token_hash}",
+            entry,
+            [f"pat:{entry['id']}"],
+            ttl
+        )
+    
+    async def invalidate(self, pat_id: int):
+        if not self.enabled:
+            return
+        await self.backend.invalidate_tags([f"pat:{pat_id}"])
+    
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, **self.backend.stats()}
+
+
+def create_backend(name: str, max_entries: int, ttl: float) -> CacheBackend:
+    if name == "memory":
+        return MemoryCache(max_entries=max_entries, ttl=ttl)
+    raise ValueError(f"Unknown cache backend: {name}")
+
+
+query_cache = QueryCache(
+    create_backend(settings.QUERY_CACHE_BACKEND, settings.QUERY_CACHE_MAX_ENTRIES, settings.QUERY_CACHE_TTL),
+    enabled=settings.QUERY_CACHE_ENABLED
+)
+user_cache = UserCache(
+    create_backend(settings.USER_CACHE_BACKEND, settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL),
+    enabled=settings.USER_CACHE_ENABLED
+)
+pat_cache = PatCache(
+    create_backend(settings.PAT_CACHE_BACKEND, settings.PAT_CACHE_MAX_ENTRIES, settings.PAT_CACHE_TTL),
+    enabled=settings.PAT_CACHE_ENABLED
+)
@@ -2,15 +2,59 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
 from app.db.session import get_db
 from app.db.models import User, PersonalAccessToken
-from app.core.security import decode_access_token
+from app.core.security import decode_access_token, hash_pat_token, is_pat_token, looks_like_jwt
+from app.core.cache import pat_cache, user_cache
+from datetime import timezone
 from typing import Optional
+import time
 
 
 security = HTTPBearer()
 
 
+async def load_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    snapshot = await user_cache.get(user_id)
+    if snapshot is not None:
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+    
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if user is not None:
+        await user_cache.set(user_id, {column.key: getattr(user, column.key) for column in User.__table__.columns})
+    return user
+
+
+async def lookup_pat(db: AsyncSession, token: str) -> Optional[dict]:
+    token_hash = hash_pat_token(token)
+    entry = await pat_cache.get(token_hash)
+    if entry is not None:
+        return entry
+    
+    result = await db.execute(
+        select(PersonalAccessToken.id, PersonalAccessToken.user_id, PersonalAccessToken.expires_at)
+        .where(PersonalAccessToken.token_hash == token_hash)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    
+    expires_at = row.expires_at
+    if expires_at is not None and expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    entry = {
+        "id": row.id,
+        "user_id": row.user_id,
+        "expires_at": expires_at.timestamp() if expires_at is not None else None,
+    }
+    await pat_cache.set(token_hash, entry)
+    return entry
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
@@ -23,17 +67,29 @@ async def get_current_user(
     
     token = credentials.credentials
     
-    payload = decode_access_token(token)
-    if payload is None:
-        credentials_exception.detail = "Invalid token"
-        raise credentials_exception
-    
-    user_id: Optional[int] = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
+    if looks_like_jwt(token):
+        payload = decode_access_token(token)
+        if payload is None:
+            credentials_exception.detail = "Invalid token"
+            raise credentials_exception
+        try:
+            user_id = int(payload.get("sub"))
+        except (TypeError, ValueError):
+            raise credentials_exception
+    else:
+        # PATs issued before the memos_pat_ prefix existed are not JWTs either; the
+        # hashing migration kept their digests, so they are looked up the same way.
+        pat = await lookup_pat(db, token)
+        if pat is None:
+            if not is_pat_token(token):
+                credentials_exception.detail = "Invalid token"
+            raise credentials_exception
+        if pat["expires_at"] is not None and pat["expires_at"] <= time.time():
+            credentials_exception.detail = "Token expired"
+            raise credentials_exception
+        user_id = pat["user_id"]
     
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await load_user(db, user_id)
     
     if user is None:
         raise credentials_exception
@@ -47,39 +103,6 @@ async def get_current_active_user(
     return current_user
 
 
-async def get_current_user_from_pat(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    token = credentials.credentials
-    
-    result = await db.execute(
-        select(PersonalAccessToken, User)
-        .join(User, PersonalAccessToken.user_id == User.id)
-        .where(PersonalAccessToken.token == token)
-    )
-    pat_user = result.first()
-    
-    if pat_user is None:
-        raise credentials_exception
-    
-    pat, user = pat_user
-    
-    if pat.expires_at and pat.expires_at < datetime.utcnow():
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token expired"
-        )
-    
-    return user
-
-
 async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: AsyncSession = Depends(get_db)
@@ -0,0 +1,286 @@
+from sqlalchemy import and_, or_, not_, select
+from typing import Any, List, NamedTuple
+from datetime import datetime, timezone
+from functools import lru_cache
+from app.db.models import Memo, MemoTag, MemoVisibility
+import re
+
+MAX_EXPRESSION_LENGTH = 2000
+MAX_DEPTH = 32
+
+TOKEN_PATTERN = re.compile(r'''
+    (?P<space>\s+)
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<number>-?\d+(?:\.\d+)?)
+  | (?P<op>&&|\|\||==|!=|<=|>=|<|>|!|\(|\)|\[|\]|,|\.)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+''', re.VERBOSE)
+
+COMPARISON_OPS = {"==", "!=", "<", "<=", ">", ">="}
+
+
+class FilterSyntaxError(ValueError):
+    pass
+
+
+class Token(NamedTuple):
+    kind: str
+    value: Any
+    pos: int
+
+
+class And(NamedTuple):
+    left: Any
+    right: Any
+
+
+class Or(NamedTuple):
+    left: Any
+    right: Any
+
+
+class Not(NamedTuple):
+    operand: Any
+
+
+class Compare(NamedTuple):
+    field: str
+    op: str
+    value: Any
+
+
+class In(NamedTuple):
+    field: str
+    values: tuple
+
+
+class Contains(NamedTuple):
+    field: str
+    value: str
+
+
+class Flag(NamedTuple):
+    field: str
+
+
+def tokenize(expression: str) -> List[Token]:
+    tokens = []
+    pos = 0
+    while pos < len(expression):
+        match = TOKEN_PATTERN.match(expression, pos)
+        if not match:
+            raise FilterSyntaxError(f"Unexpected character {expression[pos]!r} at position {pos}")
+        kind = match.lastgroup
+        text = match.group()
+        if kind == "string":
+            tokens.append(Token("value", re.sub(r'\\(.)', r'\1', text[1:-1]), pos))
+        elif kind == "number":
+            tokens.append(Token("value", float(text) if "." in text else int(text), pos))
+        elif kind == "ident" and text in ("true", "false"):
+            tokens.append(Token("value", text == "true", pos))
+        elif kind == "ident" and text == "in":
+            tokens.append(Token("op", "in", pos))
+        elif kind != "space":
+            tokens.append(Token(kind, text, pos))
+        pos = match.end()
+    tokens.append(Token("end", None, pos))
+    return tokens
+
+
+class Parser:
+    def __init__(self, expression: str):
+        self.tokens = tokenize(expression)
+        self.index = 0
+        self.depth = 0
+    
+    def peek(self) -> Token:
+        return self.tokens[self.index]
+    
+    def next(self) -> Token:
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+    
+    def expect(self, kind: str, value: Any = None) -> Token:
+        token = self.next()
+        if token.kind != kind or (value is not None and token.value != value):
+            expected = value if value is not None else kind
+            raise FilterSyntaxError(f"Expected {expected!r} at position {token.pos}")
+        return token
+    
+    def accept(self, value: str) -> bool:
+        token = self.peek()
+        if token.kind == "op" and token.value == value:
+            self.index += 1
+            return True
+        return False
+    
+    def parse(self):
+        node = self.parse_or()
+        token = self.peek()
+        if token.kind != "end":
+            raise FilterSyntaxError(f"Unexpected {token.value!r} at position {token.pos}")
+        return node
+    
+    def parse_or(self):
+        node = self.parse_and()
+        while self.accept("||"):
+            node = Or(node, self.parse_and())
+        return node
+    
+    def parse_and(self):
+        node = self.parse_unary()
+        while self.accept("&&"):
+            node = And(node, self.parse_unary())
+        return node
+    
+    def parse_unary(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise FilterSyntaxError("Filter expression is nested too deeply")
+        try:
+            if self.accept("!"):
+                return Not(self.parse_unary())
+            if self.accept("("):
+                node = self.parse_or()
+                self.expect("op", ")")
+                return node
+            return self.parse_predicate()
+        finally:
+            self.depth -= 1
+    
+    def parse_predicate(self):
+        field = self.expect("ident").value
+        
+        if self.accept("."):
+            method = self.expect("ident")
+            if method.value != "contains":
+                raise FilterSyntaxError(f"Unknown method {method.value!r} at position {method.pos}")
+            self.expect("op", "(")
+            value = self.expect("value").value
+            self.expect("op", ")")
+            return Contains(field, value)
+        
+        token = self.peek()
+        if token.kind == "op" and token.value == "in":
+            self.next()
+            return In(field, tuple(self.parse_list()))
+        if token.kind == "op" and token.value in COMPARISON_OPS:
+            self.next()
+            return Compare(field, token.value, self.expect("value").value)
+        return Flag(field)
+    
+    def parse_list(self) -> list:
+        self.expect("op", "[")
+        values = []
+        if not self.accept("]"):
+            values.append(self.expect("value").value)
+            while self.accept(","):
+                values.append(self.expect("value").value)
+            self.expect("op", "]")
+        return values
+
+
+def parse_filter(expression: str):
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise FilterSyntaxError(f"Filter expression is longer than {MAX_EXPRESSION_LENGTH} characters")
+    return Parser(expression).parse()
+
+
+def _timestamp(value: Any) -> datetime:
+    if isinstance(value, bool):
+        raise FilterSyntaxError(f"Invalid timestamp {value!r}")
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc).replace(tzinfo=None)
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise FilterSyntaxError(f"Invalid timestamp {value!r}")
+
+
+def _visibility(value: Any) -> MemoVisibility:
+    try:
+        return MemoVisibility(value)
+    except ValueError:
+        raise FilterSyntaxError(f"Invalid visibility {value!r}")
+
+
+def _compare(column, op: str, value: Any):
+    if op == "==":
+        return column == value
+    if op == "!=":
+        return column != value
+    if op == "<":
+        return column < value
+    if op == "<=":
+        return column <= value
+    if op == ">":
+        return column > value
+    return column >= value
+
+
+def _tagged(tags: tuple):
+    return Memo.id.in_(select(MemoTag.memo_id).where(MemoTag.tag.in_(tags)))
+
+
+def _compile(node):
+    if isinstance(node, And):
+        return and_(_compile(node.left), _compile(node.right))
+    if isinstance(node, Or):
+        return or_(_compile(node.left), _compile(node.right))
+    if isinstance(node, Not):
+        return not_(_compile(node.operand))
+    
+    field = node.field
+    if isinstance(node, Flag):
+        if field != "pinned":
+            raise FilterSyntaxError(f"Field {field!r} cannot be used as a condition on its own")
+        return Memo.pinned == True
+    
+    if isinstance(node, Contains):
+        if field != "content" or not isinstance(node.value, str):
+            raise FilterSyntaxError("Only content.contains(\"...\") is supported")
+        return Memo.content.ilike(f"%{node.value}%")
+    
+    if field == "tag":
+        if isinstance(node, In):
+            if not all(isinstance(v, str) for v in node.values):
+                raise FilterSyntaxError("Tags must be strings")
+            return _tagged(node.values)
+        if node.op not in ("==", "!=") or not isinstance(node.value, str):
+            raise FilterSyntaxError("Tags only support ==, != and in with string values")
+        condition = _tagged((node.value,))
+        return condition if node.op == "==" else not_(condition)
+    
+    if field == "pinned":
+        if isinstance(node, In) or node.op not in ("==", "!=") or not isinstance(node.value, bool):
+            raise FilterSyntaxError("pinned only supports == and != with true or false")
+        return _compare(Memo.pinned, node.op, node.value)
+    
+    if field == "visibility":
+        if isinstance(node, In):
+            return Memo.visibility.in_([_visibility(v) for v in node.values])
+        if node.op not in ("==", "!="):
+            raise FilterSyntaxError("visibility only supports ==, != and in")
+        return _compare(Memo.visibility, node.op, _visibility(node.value))
+    
+    if field == "creator_id":
+        values = node.values if isinstance(node, In) else (node.value,)
+        if not all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+            raise FilterSyntaxError("creator_id must be compared with integers")
+        if isinstance(node, In):
+            return Memo.creator_id.in_(values)
+        return _compare(Memo.creator_id, node.op, node.value)
+    
+    if field in ("created_ts", "updated_ts"):
+        column = getattr(Memo, field)
+        if isinstance(node, In):
+            return column.in_([_timestamp(v) for v in node.values])
+        return _compare(column, node.op, _timestamp(node.value))
+    
+    raise FilterSyntaxError(f"Unknown field {field!r}")
+
+
+@lru_cache(maxsize=512)
+def compile_filter(expression: str):
+    return _compile(parse_filter(expression))
@@ -0,0 +1,63 @@
+from typing import List, Tuple
+import html
+import re
+
+MAX_MATCHES = 50
+
+
+def search_terms(query: str) -> List[str]:
+    return list(dict.fromkeys(term.lower() for term in re.findall(r'\w+', query)))
+
+
+def find_matches(text: str, terms: List[str], max_matches: int = MAX_MATCHES) -> List[Tuple[int, int]]:
+    if not terms:
+        return []
+    pattern = re.compile(r'(?<!\w)(?:' + "|".join(re.escape(t) for t in terms) + r')\w*', re.IGNORECASE)
+    matches = []
+    for match in pattern.finditer(text):
+        matches.append((match.start(), match.end()))
+        if len(matches) >= max_matches:
+            break
+    return matches
+
+
+def _best_window(matches: List[Tuple[int, int]], window: int) -> int:
+    best_start, best_count = matches[0][0], 0
+    right = 0
+    for left, (start, _) in enumerate(matches):
+        while right < len(matches) and matches[right][1] - start <= window:
+            right += 1
+        if right - left > best_count:
+            best_start, best_count = start, right - left
+    return best_start
+
+
+def build_snippet(text: str, matches: List[Tuple[int, int]], window: int = 160) -> str:
+    if not matches:
+        end = min(len(text), window)
+        snippet = html.escape(text[:end])
+        return snippet + ("…" if end < len(text) else "")
+    
+    start = max(0, _best_window(matches, window) - window // 4)
+    if start > 0:
+        space = text.rfind(" ", max(0, start - 20), start)
+        start = space + 1 if space != -1 else start
+    end = min(len(text), start + window)
+    if end < len(text):
+        space = text.find(" ", end, end + 20)
+        end = space if space != -1 else end
+    
+    parts = ["…"] if start > 0 else []
+    cursor = start
+    for match_start, match_end in matches:
+        if match_end <= start or match_start >= end:
+            continue
+        match_start, match_end = max(match_start, start), min(match_end, end)
+        parts.append(html.escape(text[cursor:match_start]))
+        parts.append(f"<mark>{html.escape(text[match_start:match_end])}</mark>")
+        cursor = match_end
+    parts.append(html.escape(text[cursor:end]))
+    if end < len(text):
+        parts.append("…")
+    
+    return "".join(parts).replace("\n", " ")
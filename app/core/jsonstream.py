@@ -0,0 +1,100 @@
+from typing import Any, AsyncIterator
+import codecs
+import json
+import re
+
+WHITESPACE = re.compile(r"[ \t\r\n]*")
+
+
+def parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"Invalid JSON: {e}")
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    # A line that does not parse is yielded as a ValueError so the caller can report it
+    # against its position and carry on with the next line.
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        if b"\n" not in chunk:
+            continue
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield parse_line(line)
+    if buffer.strip():
+        yield parse_line(buffer)
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    # Items are decoded one at a time as soon as they are complete, so only the item
+    # being read is held in memory rather than the whole array. Broken structure
+    # cannot be resynchronised, so it ends the stream with a single ValueError.
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    state = "start"
+    
+    async def fill() -> bool:
+        nonlocal buffer, pos
+        async for chunk in chunks:
+            buffer = buffer[pos:] + utf8.decode(chunk)
+            pos = 0
+            return True
+        buffer = buffer[pos:] + utf8.decode(b"", final=True)
+        pos = 0
+        return False
+    
+    more = True
+    while True:
+        pos = WHITESPACE.match(buffer, pos).end()
+        if pos == len(buffer):
+            if not more:
+                if state != "end":
+                    yield ValueError("Invalid JSON: unexpected end of input")
+                return
+            more = await fill()
+            continue
+        
+        char = buffer[pos]
+        if state == "start":
+            if char != "[":
+                yield ValueError("Invalid JSON: expected an array")
+                return
+            pos += 1
+            state = "first"
+        elif state == "end":
+            yield ValueError("Invalid JSON: unexpected data after the array")
+            return
+        elif state in ("first", "separator") and char == "]":
+            pos += 1
+            state = "end"
+        elif state == "separator":
+            if char != ",":
+                yield ValueError("Invalid JSON: expected ',' or ']'")
+                return
+            pos += 1
+            state = "item"
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except ValueError as e:
+                # The item may simply be split across chunks; only give up once the
+                # stream has nothing more to add.
+                if more:
+                    more = await fill()
+                    continue
+                yield ValueError(f"Invalid JSON: {e}")
+                return
+            if end == len(buffer) and more:
+                # A bare number cut off by the chunk boundary still decodes, so wait
+                # until something follows it.
+                more = await fill()
+                continue
+            pos = end
+            state = "separator"
+            yield item
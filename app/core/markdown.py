@@ -1,69 +1,351 @@
-from markdown_it import MarkdownIt
+from markdown_it import MarkdownIt, __version__ as markdown_it_version
 from mdit_py_plugins.front_matter import front_matter_plugin
 from mdit_py_plugins.tasklists import tasklists_plugin
-from typing import Optional
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional
+from app.config import settings
+import hashlib
+import json
 import re
 
+PREVIEW_LENGTH = 200
+
+TAG_PATTERN = re.compile(r'(?<![^\s(\[])#(\w+)')
+FENCE_PATTERN = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+BLOCK_CONTINUATION = re.compile(r'^(?:[ \t]|[*+-](?:[ \t]|$)|\d{1,9}[.)](?:[ \t]|$))')
+# Reference definitions and raw HTML blocks that may span blank lines make blocks
+# depend on each other, so documents containing them are always rendered whole.
+UNSPLITTABLE_PATTERN = re.compile(
+    r'^ {0,3}(?:\[[^\]]+\]:|<(?:pre|script|style|textarea)\b|<!--|<\?|<![A-Za-z]|<!\[CDATA\[)',
+    re.MULTILINE | re.IGNORECASE
+)
+
+
+def split_blocks(markdown_text: str) -> Optional[List[str]]:
+    if UNSPLITTABLE_PATTERN.search(markdown_text):
+        return None
+    
+    lines = markdown_text.split('\n')
+    blocks = []
+    current = []
+    start = 0
+    
+    if lines[0].rstrip() == '---':
+        for i in range(1, len(lines)):
+            if lines[i].rstrip() == '---':
+                current = lines[:i + 1]
+                start = i + 1
+                break
+    
+    fence = None
+    has_content = False
+    after_blank = False
+    for line in lines[start:]:
+        if fence:
+            current.append(line)
+            marker = FENCE_PATTERN.match(line)
+            if marker and marker.group(1)[0] == fence[0] and len(marker.group(1)) >= len(fence) \
+                    and not line[marker.end():].strip():
+                fence = None
+            continue
+        
+        if not line.strip():
+            after_blank = has_content
+            current.append(line)
+            continue
+        
+        # After a blank line only indented lines and list items can continue the
+        # previous block; anything else starts a block that renders on its own.
+        if after_blank and not BLOCK_CONTINUATION.match(line):
+            blocks.append('\n'.join(current).strip('\n') + '\n')
+            current = []
+        after_blank = False
+        has_content = True
+        current.append(line)
+        
+        marker = FENCE_PATTERN.match(line)
+        if marker and not (marker.group(1)[0] == '`' and '`' in line[marker.end():]):
+            fence = marker.group(1)
+    
+    if current:
+        blocks.append('\n'.join(current).strip('\n') + ('\n' if markdown_text.endswith('\n') else ''))
+    return blocks
+
+
+class MarkdownAnalysis(NamedTuple):
+    html: str
+    text: str
+    tags: List[str]
+    links: List[dict]
+    front_matter: dict
+    has_code: bool
+    has_task_list: bool
+
+
+class RenderCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[MarkdownAnalysis]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+    
+    def set(self, key: str, analysis: MarkdownAnalysis, size: int):
+        if size > self.max_bytes:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= old[1]
+        self.entries[key] = (analysis, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
 
 class MarkdownRenderer:
-    def __init__(self):
-        self.md = MarkdownIt(
-            "commonmark",
-            {
-                "html": True,
-                "linkify": True,
-                "typographer": True,
-                "breaks": True
-            }
+    def __init__(self, cache_max_bytes: int = 32 * 1024 * 1024):
+        self.options = {
+            "html": True,
+            "linkify": True,
+            "typographer": True,
+            "breaks": True
+        }
+        self.plugins = [front_matter_plugin, tasklists_plugin]
+        self.md = MarkdownIt("commonmark", self.options)
+        for plugin in self.plugins:
+            self.md.use(plugin)
+        # Blocks after the first one never start the document, so they must not be
+        # mistaken for front matter.
+        self.md_body = MarkdownIt("commonmark", self.options).use(tasklists_plugin)
+        
+        config = {
+            "preset": "commonmark",
+            "options": self.options,
+            "plugins": [plugin.__name__ for plugin in self.plugins],
+            "version": markdown_it_version,
+        }
+        self.config_hash = hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+        self.cache = RenderCache(cache_max_bytes)
+    
+    def cache_key(self, markdown_text: str) -> str:
+        digest = hashlib.sha256(markdown_text.encode()).hexdigest()
+        return f"{self.config_hash}:{digest}"
+    
+    def analyze(self, markdown_text: str, key: Optional[str] = None, body: bool = False) -> MarkdownAnalysis:
+        key = key or self.cache_key(markdown_text)
+        analysis = self.cache.get(key)
+        if analysis is None:
+            analysis = self._analyze(markdown_text, self.md_body if body else self.md)
+            size = len(analysis.html.encode()) + len(analysis.text.encode()) + len(json.dumps(
+                [analysis.tags, analysis.links, analysis.front_matter]
+            ))
+            self.cache.set(key, analysis, size)
+        return analysis
+    
+    def _analyze(self, markdown_text: str, md: MarkdownIt) -> MarkdownAnalysis:
+        env = {}
+        tokens = md.parse(markdown_text, env)
+        html = md.renderer.render(tokens, md.options, env)
+        
+        text_parts = []
+        tags = {}
+        links = []
+        front_matter = {}
+        has_code = False
+        has_task_list = False
+        
+        for token in tokens:
+            if token.type == "front_matter":
+                front_matter = self._parse_front_matter(token.content)
+            elif token.type in ("fence", "code_block"):
+                has_code = True
+                text_parts.append(token.content)
+            elif token.type == "inline":
+                link = None
+                for child in token.children or []:
+                    if child.type == "text":
+                        text_parts.append(child.content)
+                        if link is not None:
+                            link["text"] += child.content
+                        else:
+                            for tag in TAG_PATTERN.findall(child.content):
+                                tags[tag] = True
+                    elif child.type == "code_inline":
+                        has_code = True
+                        text_parts.append(child.content)
+                        if link is not None:
+                            link["text"] += child.content
+                    elif child.type in ("softbreak", "hardbreak"):
+                        text_parts.append(" ")
+                    elif child.type == "link_open":
+                        link = {"text": "", "url": child.attrGet("href") or ""}
+                    elif child.type == "link_close" and link is not None:
+                        links.append(link)
+                        link = None
+                    elif child.type == "html_inline" and "task-list-item-checkbox" in child.content:
+                        has_task_list = True
+                text_parts.append(" ")
+        
+        return MarkdownAnalysis(
+            html=html,
+            text=" ".join("".join(text_parts).split()),
+            tags=list(tags),
+            links=links,
+            front_matter=front_matter,
+            has_code=has_code,
+            has_task_list=has_task_list
         )
-        self.md.use(front_matter_plugin)
-        self.md.use(tasklists_plugin)
     
     def render(self, markdown_text: str) -> str:
-        return self.md.render(markdown_text)
+        return self.analyze(markdown_text).html
     
-    def extract_front_matter(self, markdown_text: str) -> dict:
-        front_matter = {}
-        lines = markdown_text.split('\n')
-        in_front_matter = False
-        front_matter_lines = []
+    def memo_payload(self, markdown_text: str, previous: Optional[dict] = None) -> dict:
+        key = self.cache_key(markdown_text)
+        blocks = None
+        if len(markdown_text) >= settings.BLOCK_RENDER_MIN_LENGTH:
+            blocks = split_blocks(markdown_text)
         
-        for line in lines:
-            if line.strip() == '---':
-                if not in_front_matter:
-                    in_front_matter = True
-                else:
-                    break
-            elif in_front_matter:
-                front_matter_lines.append(line)
+        if blocks is not None and len(blocks) > 1:
+            analysis, block_meta = self._analyze_blocks(blocks, previous)
+        else:
+            analysis, block_meta = self.analyze(markdown_text, key), None
         
-        if front_matter_lines:
-            for line in front_matter_lines:
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    front_matter[key.strip()] = value.strip()
+        render = {
+            "key": key,
+            "html": analysis.html,
+            "preview": self._truncate(analysis.text, PREVIEW_LENGTH),
+        }
+        if block_meta is not None:
+            render["blocks"] = block_meta
         
-        return front_matter
+        return {
+            "render": render,
+            "property": {
+                "tags": analysis.tags,
+                "links": analysis.links,
+                "front_matter": analysis.front_matter,
+                "has_link": bool(analysis.links),
+                "has_code": analysis.has_code,
+                "has_task_list": analysis.has_task_list,
+            },
+        }
+    
+    def _previous_blocks(self, previous: Optional[dict]) -> dict:
+        render = (previous or {}).get("render") or {}
+        if not render.get("blocks") or not render.get("key", "").startswith(f"{self.config_hash}:"):
+            return {}
+        
+        reusable = {}
+        offset = 0
+        for block in render["blocks"]:
+            html = render["html"][offset:offset + block["html_length"]]
+            offset += block["html_length"]
+            reusable[block["hash"]] = (block, html)
+        return reusable
+    
+    def _analyze_blocks(self, blocks: List[str], previous: Optional[dict]) -> tuple:
+        reusable = self._previous_blocks(previous)
+        html_parts = []
+        text_parts = []
+        tags = {}
+        links = []
+        front_matter = {}
+        has_code = False
+        has_task_list = False
+        block_meta = []
+        
+        for i, block in enumerate(blocks):
+            digest = hashlib.sha256(f"{'body' if i else 'head'}:{block}".encode()).hexdigest()
+            if digest in reusable:
+                meta, html = reusable[digest]
+            else:
+                analysis = self.analyze(block, f"{self.config_hash}:block:{digest}", body=i > 0)
+                html = analysis.html
+                meta = {
+                    "hash": digest,
+                    "html_length": len(html),
+                    "text": analysis.text[:PREVIEW_LENGTH + 1],
+                    "tags": analysis.tags,
+                    "links": analysis.links,
+                    "has_code": analysis.has_code,
+                    "has_task_list": analysis.has_task_list,
+                }
+                if i == 0:
+                    front_matter = analysis.front_matter
+            if i == 0 and digest in reusable:
+                front_matter = ((previous or {}).get("property") or {}).get("front_matter", {})
+            
+            html_parts.append(html)
+            text_parts.append(meta["text"])
+            tags.update(dict.fromkeys(meta["tags"]))
+            links.extend(meta["links"])
+            has_code = has_code or meta["has_code"]
+            has_task_list = has_task_list or meta["has_task_list"]
+            block_meta.append(meta)
+        
+        analysis = MarkdownAnalysis(
+            html="".join(html_parts),
+            text=" ".join(" ".join(text_parts).split()),
+            tags=list(tags),
+            links=links,
+            front_matter=front_matter,
+            has_code=has_code,
+            has_task_list=has_task_list
+        )
+        return analysis, block_meta
+    
+    def cached_payload(self, payload: Optional[dict], markdown_text: str) -> Optional[dict]:
+        stored = (payload or {}).get("render")
+        if stored and stored.get("key") == self.cache_key(markdown_text):
+            return stored
+        return None
+    
+    def extract_front_matter(self, markdown_text: str) -> dict:
+        return dict(self.analyze(markdown_text).front_matter)
     
     def extract_tags(self, markdown_text: str) -> list:
-        tag_pattern = r'#(\w+)'
-        tags = re.findall(tag_pattern, markdown_text)
-        return list(set(tags))
+        return list(self.analyze(markdown_text).tags)
     
     def extract_links(self, markdown_text: str) -> list:
-        link_pattern = r'\[([^\]]+)\]\(([^)]+)\)'
-        links = re.findall(link_pattern, markdown_text)
-        return [{"text": text, "url": url} for text, url in links]
-    
-    def get_preview(self, markdown_text: str, max_length: int = 200) -> str:
-        rendered = self.render(markdown_text)
-        plain_text = re.sub(r'<[^>]+>', '', rendered)
-        plain_text = ' '.join(plain_text.split())
-        
+        return [dict(link) for link in self.analyze(markdown_text).links]
+    
+    def get_preview(self, markdown_text: str, max_length: int = PREVIEW_LENGTH) -> str:
+        return self._truncate(self.analyze(markdown_text).text, max_length)
+    
+    def _parse_front_matter(self, content: str) -> dict:
+        front_matter = {}
+        for line in content.split('\n'):
+            if ':' in line:
+                key, value = line.split(':', 1)
+                front_matter[key.strip()] = value.strip()
+        return front_matter
+    
+    def _truncate(self, plain_text: str, max_length: int) -> str:
         if len(plain_text) <= max_length:
             return plain_text
         
         return plain_text[:max_length] + '...'
 
 
-markdown_renderer = MarkdownRenderer()
+markdown_renderer = MarkdownRenderer(cache_max_bytes=settings.RENDER_CACHE_MAX_BYTES)
@@ -0,0 +1,96 @@
+from fastapi import Query
+from sqlalchemy import and_, or_, literal, String
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+from datetime import datetime
+import base64
+import binascii
+import json
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+class Page(NamedTuple):
+    items: list
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    encoded = [{"dt": value.isoformat()} if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(encoded, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list):
+            raise ValueError("cursor must encode a list")
+        return [datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value for value in values]
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def get_cursor(cursor: Optional[str] = Query(None)) -> Optional[list]:
+    if cursor is None:
+        return None
+    return decode_cursor(cursor)
+
+
+def sqlite_timestamp(value: datetime) -> str:
+    formatted = value.strftime("%Y-%m-%d %H:%M:%S")
+    if value.microsecond:
+        formatted += f".{value.microsecond:06d}"
+    return formatted
+
+
+def _bind_value(dialect: str, value: Any):
+    # SQLite stores server-side timestamps as text without fractional seconds,
+    # so bind cursor timestamps in the same layout to keep equality comparable.
+    if dialect == "sqlite" and isinstance(value, datetime):
+        return literal(sqlite_timestamp(value), String)
+    return value
+
+
+def keyset_condition(dialect: str, keys: List[Tuple[Any, bool]], values: list):
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        value = _bind_value(dialect, values[i])
+        equal_prefix = [keys[j][0] == _bind_value(dialect, values[j]) for j in range(i)]
+        step = column < value if descending else column > value
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+
+async def paginate(
+    db: AsyncSession,
+    query,
+    keys: List[Tuple[Any, bool]],
+    cursor: Optional[list] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> Page:
+    query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in keys])
+    query = query.add_columns(*[column.label(f"cursor_key_{i}") for i, (column, _) in enumerate(keys)])
+    
+    if cursor is not None:
+        if len(cursor) != len(keys):
+            raise InvalidCursorError("Invalid cursor")
+        query = query.where(keyset_condition(db.get_bind().dialect.name, keys, cursor))
+    elif skip:
+        query = query.offset(skip)
+    
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(list(rows[-1][1:]))
+    
+    return Page(items=[row[0] for row in rows], next_cursor=next_cursor)
@@ -0,0 +1,250 @@
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from starlette.responses import JSONResponse
+from app.core.cache import pat_cache
+from app.core.security import decode_access_token, hash_pat_token, looks_like_jwt
+from app.config import settings
+import math
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class RateLimitRule(NamedTuple):
+    name: str
+    method: Optional[str]
+    path: str
+    rate: float
+    burst: int
+
+
+def parse_rules(limits: dict) -> List[RateLimitRule]:
+    rules = []
+    for route, limit in limits.items():
+        count, period = limit.split("/", 1)
+        burst = int(count)
+        rate = burst / PERIODS[period.strip().rstrip("s")]
+        if route == "default":
+            rules.append(RateLimitRule(name=route, method=None, path="/", rate=rate, burst=burst))
+        else:
+            method, path = route.split(" ", 1)
+            rules.append(RateLimitRule(name=route, method=method.upper(), path=path.strip(), rate=rate, burst=burst))
+    # The most specific prefix wins; the default rule matches everything last.
+    return sorted(rules, key=lambda rule: (rule.method is None, -len(rule.path)))
+
+
+class RateLimitStore:
+    async def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        raise NotImplementedError
+    
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self.buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+    
+    async def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self.buckets.pop(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated) * rate)
+        
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+            self.allowed += 1
+        else:
+            self.limited += 1
+        
+        self.buckets[key] = (tokens, now)
+        while len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+    
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "keys": len(self.buckets),
+            "max_keys": self.max_keys,
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+
+class PoolUsage:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.checked_out = 0
+        self.saturated_since: Optional[float] = None
+    
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checked_out += 1
+        if self.checked_out >= self.capacity and self.saturated_since is None:
+            self.saturated_since = time.monotonic()
+    
+    def on_checkin(self, dbapi_connection, connection_record):
+        self.checked_out = max(self.checked_out - 1, 0)
+        if self.checked_out < self.capacity:
+            self.saturated_since = None
+    
+    def saturated_for(self) -> float:
+        return time.monotonic() - self.saturated_since if self.saturated_since is not None else 0.0
+    
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "checked_out": self.checked_out,
+            "saturated_for": self.saturated_for(),
+        }
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight: int, db_wait_threshold: float):
+        self.max_in_flight = max_in_flight
+        self.db_wait_threshold = db_wait_threshold
+        self.in_flight = 0
+        self.shed = 0
+        self.pools: Dict[str, PoolUsage] = {}
+    
+    def watch_pool(self, name: str, engine, max_overflow: int):
+        # Only bounded queue pools make callers wait for a connection; SQLite's NullPool
+        # and unbounded overflow never do.
+        pool = engine.sync_engine.pool
+        if not isinstance(pool, QueuePool) or max_overflow < 0:
+            return
+        usage = PoolUsage(pool.size() + max_overflow)
+        self.pools[name] = usage
+        event.listen(pool, "checkout", usage.on_checkout)
+        event.listen(pool, "checkin", usage.on_checkin)
+    
+    def overloaded(self) -> Optional[str]:
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return "Too many requests in flight"
+        # A pool that has stayed exhausted this long means new requests would queue
+        # behind it for at least as long, so refuse them before they tie up a worker.
+        if self.db_wait_threshold:
+            for name, usage in self.pools.items():
+                if usage.saturated_for() >= self.db_wait_threshold:
+                    return f"Database connection pool exhausted ({name})"
+        return None
+    
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "shed": self.shed,
+            "db_pools": {name: usage.stats() for name, usage in self.pools.items()},
+        }
+
+
+class RateLimiter:
+    def __init__(self, store: RateLimitStore, rules: List[RateLimitRule], enabled: bool = True):
+        self.store = store
+        self.rules = rules
+        self.enabled = enabled
+    
+    def match(self, method: str, path: str) -> Optional[RateLimitRule]:
+        for rule in self.rules:
+            if (rule.method is None or rule.method == method) and path.startswith(rule.path):
+                return rule
+        return None
+    
+    async def client_key(self, scope) -> str:
+        authorization = ""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value.decode("latin-1")
+                break
+        
+        # Only credentials that were already verified identify a user; anything else
+        # falls back to the client address so made-up tokens cannot mint fresh buckets.
+        if authorization[:7].lower() == "bearer ":
+            token = authorization[7:].strip()
+            if looks_like_jwt(token):
+                payload = decode_access_token(token)
+                if payload and payload.get("sub"):
+                    return f"user:{payload['sub']}"
+            else:
+                pat = await pat_cache.get(hash_pat_token(token))
+                if pat is not None:
+                    return f"user:{pat['user_id']}"
+        
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+    
+    async def check(self, scope) -> Tuple[bool, float]:
+        rule = self.match(scope["method"], scope["path"])
+        if rule is None:
+            return True, 0.0
+        key = await self.client_key(scope)
+        return await self.store.take(f"{rule.name}|{key}", rule.rate, rule.burst)
+    
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, **self.store.stats()}
+
+
+def create_store(name: str, max_keys: int) -> RateLimitStore:
+    if name == "memory":
+        return MemoryRateLimitStore(max_keys=max_keys)
+    raise ValueError(f"Unknown rate limit backend: {name}")
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, limiter: RateLimiter, admission: AdmissionController):
+        self.app = app
+        self.limiter = limiter
+        self.admission = admission
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        
+        if self.limiter.enabled:
+            allowed, retry_after = await self.limiter.check(scope)
+            if not allowed:
+                response = JSONResponse(
+                    status_code=429,
+                    content={"detail": "Rate limit exceeded"},
+                    headers={"Retry-After": str(math.ceil(retry_after))}
+                )
+                await response(scope, receive, send)
+                return
+        
+        reason = self.admission.overloaded()
+        if reason is not None:
+            self.admission.shed += 1
+            logger.warning(f"Shedding {scope['method']} {scope['path']}: {reason}")
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": reason},
+                headers={"Retry-After": "1"}
+            )
+            await response(scope, receive, send)
+            return
+        
+        self.admission.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.admission.in_flight -= 1
+
+
+rate_limiter = RateLimiter(
+    create_store(settings.RATE_LIMIT_BACKEND, settings.RATE_LIMIT_MAX_KEYS),
+    parse_rules(settings.RATE_LIMITS),
+    enabled=settings.RATE_LIMIT_ENABLED
+)
+admission_controller = AdmissionController(
+    max_in_flight=settings.MAX_IN_FLIGHT_REQUESTS,
+    db_wait_threshold=settings.DB_POOL_WAIT_THRESHOLD
+)
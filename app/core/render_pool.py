@@ -0,0 +1,79 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from typing import AsyncIterator, List, Optional
+from app.core.markdown import MarkdownRenderer, markdown_renderer
+from app.config import settings
+import asyncio
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+_worker_renderer: Optional[MarkdownRenderer] = None
+
+
+def _init_worker(cache_max_bytes: int):
+    global _worker_renderer
+    _worker_renderer = MarkdownRenderer(cache_max_bytes=cache_max_bytes)
+
+
+def _render_chunk(texts: List[str]) -> List[dict]:
+    return [_worker_renderer.memo_payload(text) for text in texts]
+
+
+class RenderPool:
+    def __init__(self, max_workers: int, chunk_size: int, inline_threshold: int):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.inline_threshold = inline_threshold
+        self.executor: Optional[ProcessPoolExecutor] = None
+    
+    def get_executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(settings.RENDER_CACHE_MAX_BYTES // self.max_workers,)
+            )
+            logger.info(f"Started Markdown render pool with {self.max_workers} workers")
+        return self.executor
+    
+    async def render_many(self, texts: List[str]) -> AsyncIterator[dict]:
+        if len(texts) <= self.inline_threshold:
+            for text in texts:
+                yield markdown_renderer.memo_payload(text)
+            return
+        
+        loop = asyncio.get_running_loop()
+        executor = self.get_executor()
+        chunks = iter([texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)])
+        pending = deque()
+        try:
+            # Keep every worker busy with one chunk queued behind it, but no more, so a
+            # slow consumer does not pile finished chunks up in memory.
+            for chunk in chunks:
+                pending.append(loop.run_in_executor(executor, _render_chunk, chunk))
+                if len(pending) >= self.max_workers * 2:
+                    break
+            while pending:
+                results = await pending.popleft()
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.append(loop.run_in_executor(executor, _render_chunk, chunk))
+                for result in results:
+                    yield result
+        finally:
+            for future in pending:
+                future.cancel()
+    
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+render_pool = RenderPool(
+    max_workers=settings.RENDER_WORKERS,
+    chunk_size=settings.RENDER_CHUNK_SIZE,
+    inline_threshold=settings.RENDER_INLINE_THRESHOLD
+)
@@ -1,19 +1,101 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
+import asyncio
+import hashlib
+import time
 
+# Personal access tokens carry a fixed prefix so they can be told apart from JWTs
+# without attempting to decode them.
+PAT_PREFIX = "memos_pat_"
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Pinning min and max rounds to the configured cost makes verify_and_update flag
+# every hash made with a different cost, so changing BCRYPT_ROUNDS rehashes on login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
 
+class PasswordHasherBusyError(Exception):
+    pass
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+
+class PasswordHasher:
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hasher")
+        self.pending = 0
+        self.calls = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+        self.max_run = 0.0
+    
+    async def run(self, func, *args):
+        # Waiting requests queue up in the executor; past max_pending, fail fast instead
+        # of letting a login burst build an unbounded backlog.
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusyError("Too many pending password operations")
+        
+        self.pending += 1
+        submitted = time.perf_counter()
+        timings = {}
+        
+        def timed():
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                timings["wait"] = started - submitted
+                timings["run"] = time.perf_counter() - started
+        
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, timed)
+        finally:
+            self.pending -= 1
+            if timings:
+                self.calls += 1
+                self.total_wait += timings["wait"]
+                self.total_run += timings["run"]
+                self.max_run = max(self.max_run, timings["run"])
+    
+    async def hash(self, password: str) -> str:
+        return await self.run(pwd_context.hash, password)
+    
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self.run(pwd_context.verify_and_update, plain_password, hashed_password)
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+    
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "avg_wait_ms": self.total_wait / self.calls * 1000 if self.calls else 0.0,
+            "avg_run_ms": self.total_run / self.calls * 1000 if self.calls else 0.0,
+            "max_run_ms": self.max_run * 1000,
+        }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -27,14 +109,85 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+class TokenCache:
+    def __init__(self, max_entries: int, enabled: bool = True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, digest: str) -> Optional[dict]:
+        entry = self.entries.get(digest)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            del self.entries[digest]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(digest)
+        self.hits += 1
+        return dict(claims)
+    
+    def set(self, digest: str, claims: dict):
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+        self.entries[digest] = (expires_at, dict(claims))
+        self.entries.move_to_end(digest)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+token_cache = TokenCache(max_entries=settings.TOKEN_CACHE_MAX_ENTRIES, enabled=settings.TOKEN_CACHE_ENABLED)
+
+
 def decode_access_token(token: str) -> Optional[dict]:
+    # Only tokens that passed signature verification are cached, and each entry dies
+    # at the token's own exp, so a cache hit is as trustworthy as a fresh decode.
+    digest = hashlib.sha256(token.encode()).hexdigest() if token_cache.enabled else None
+    if digest is not None:
+        claims = token_cache.get(digest)
+        if claims is not None:
+            return claims
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        return payload
     except JWTError:
         return None
+    
+    if digest is not None:
+        token_cache.set(digest, payload)
+    return payload
 
 
 def generate_pat_token() -> str:
     import secrets
-    return secrets.token_urlsafe(32)
+    return PAT_PREFIX + secrets.token_urlsafe(32)
+
+
+def is_pat_token(token: str) -> bool:
+    return token.startswith(PAT_PREFIX)
+
+
+def looks_like_jwt(token: str) -> bool:
+    # Legacy PATs are URL-safe base64 and never contain a dot, so anything shaped like
+    # header.payload.signature can only be a JWT.
+    return not is_pat_token(token) and token.count(".") == 2
+
+
+def hash_pat_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
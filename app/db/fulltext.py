@@ -0,0 +1,158 @@
+from sqlalchemy import select, text, func, literal_column
+from sqlalchemy.dialects.mysql import match as mysql_match
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncConnection
+from typing import List, Optional, Tuple, Union
+from app.db.models import Memo
+from app.config import settings
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FullTextIndex:
+    sqlite_table = "memo_fts"
+    postgres_index = "ix_memo_content_fts"
+    mysql_index = "ft_memo_content"
+    
+    def dialect_name(self, db: Union[AsyncSession, AsyncConnection]) -> str:
+        if isinstance(db, AsyncSession):
+            return db.get_bind().dialect.name
+        return db.dialect.name
+    
+    def is_enabled(self) -> bool:
+        return settings.FULLTEXT_SEARCH
+    
+    def build_sqlite_query(self, query: str) -> Optional[str]:
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return None
+        return " ".join(f'"{term}"*' for term in terms)
+    
+    def create_statements(self, dialect: str) -> List[str]:
+        if dialect == "sqlite":
+            return [
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.sqlite_table} "
+                "USING fts5(content, content='memo', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            ]
+        if dialect == "postgresql":
+            return [
+                f"CREATE INDEX IF NOT EXISTS {self.postgres_index} "
+                "ON memo USING GIN (to_tsvector('simple', content))"
+            ]
+        if dialect == "mysql":
+            return [f"CREATE FULLTEXT INDEX {self.mysql_index} ON memo (content)"]
+        return []
+    
+    def drop_statements(self, dialect: str) -> List[str]:
+        if dialect == "sqlite":
+            return [f"DROP TABLE IF EXISTS {self.sqlite_table}"]
+        if dialect == "postgresql":
+            return [f"DROP INDEX IF EXISTS {self.postgres_index}"]
+        if dialect == "mysql":
+            return [f"DROP INDEX {self.mysql_index} ON memo"]
+        return []
+    
+    def rebuild_statements(self, dialect: str) -> List[str]:
+        if dialect == "sqlite":
+            return [f"INSERT INTO {self.sqlite_table}({self.sqlite_table}) VALUES ('rebuild')"]
+        if dialect == "postgresql":
+            return [f"REINDEX INDEX {self.postgres_index}"]
+        if dialect == "mysql":
+            return ["OPTIMIZE TABLE memo"]
+        return []
+    
+    async def create(self, conn: AsyncConnection):
+        dialect = self.dialect_name(conn)
+        if dialect == "mysql":
+            result = await conn.execute(text(
+                "SELECT COUNT(*) FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = 'memo' AND index_name = :name"
+            ), {"name": self.mysql_index})
+            if result.scalar():
+                return
+        for statement in self.create_statements(dialect):
+            await conn.execute(text(statement))
+    
+    async def rebuild(self, conn: AsyncConnection):
+        dialect = self.dialect_name(conn)
+        for statement in self.rebuild_statements(dialect):
+            await conn.execute(text(statement))
+        logger.info(f"Full-text index rebuilt for {dialect}")
+    
+    async def index_memo(self, db: AsyncSession, memo_id: int, content: str):
+        if not self.is_enabled() or self.dialect_name(db) != "sqlite":
+            return
+        await db.execute(
+            text(f"INSERT INTO {self.sqlite_table}(rowid, content) VALUES (:id, :content)"),
+            {"id": memo_id, "content": content}
+        )
+    
+    async def index_memos(self, db: AsyncSession, memos: List[Tuple[int, str]]):
+        if not memos or not self.is_enabled() or self.dialect_name(db) != "sqlite":
+            return
+        await db.execute(
+            text(f"INSERT INTO {self.sqlite_table}(rowid, content) VALUES (:id, :content)"),
+            [{"id": memo_id, "content": content} for memo_id, content in memos]
+        )
+    
+    async def remove_memo(self, db: AsyncSession, memo_id: int, content: str):
+        if not self.is_enabled() or self.dialect_name(db) != "sqlite":
+            return
+        await db.execute(
+            text(
+                f"INSERT INTO {self.sqlite_table}({self.sqlite_table}, rowid, content) "
+                "VALUES ('delete', :id, :content)"
+            ),
+            {"id": memo_id, "content": content}
+        )
+    
+    async def update_memo(self, db: AsyncSession, memo_id: int, old_content: str, new_content: str):
+        if old_content == new_content:
+            return
+        await self.remove_memo(db, memo_id, old_content)
+        await self.index_memo(db, memo_id, new_content)
+    
+    def match(self, db: AsyncSession, query: str):
+        # Yields (memo_id, rank) with lower rank meaning more relevant; None means
+        # the caller should fall back to a LIKE scan.
+        if not self.is_enabled():
+            return None
+        
+        dialect = self.dialect_name(db)
+        if dialect == "sqlite":
+            fts_query = self.build_sqlite_query(query)
+            if fts_query is None:
+                return None
+            return (
+                select(
+                    literal_column("rowid").label("memo_id"),
+                    func.bm25(literal_column(self.sqlite_table)).label("rank")
+                )
+                .select_from(text(self.sqlite_table))
+                .where(text(f"{self.sqlite_table} MATCH :fts_query").bindparams(fts_query=fts_query))
+                .subquery("fts_match")
+            )
+        
+        if dialect == "postgresql":
+            vector = func.to_tsvector("simple", Memo.content)
+            ts_query = func.websearch_to_tsquery("simple", query)
+            return (
+                select(Memo.id.label("memo_id"), (-func.ts_rank_cd(vector, ts_query)).label("rank"))
+                .where(vector.op("@@")(ts_query))
+                .subquery("fts_match")
+            )
+        
+        if dialect == "mysql":
+            relevance = mysql_match(Memo.content, against=query, in_natural_language_mode=True)
+            return (
+                select(Memo.id.label("memo_id"), (-relevance).label("rank"))
+                .where(relevance > 0)
+                .subquery("fts_match")
+            )
+        
+        return None
+
+
+fulltext_index = FullTextIndex()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, JSON, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, JSON, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.session import Base
@@ -39,6 +39,10 @@ class User(Base):
 
 class Memo(Base):
     __tablename__ = "memo"
+    __table_args__ = (
+        Index("ix_memo_creator_created", "creator_id", "created_ts"),
+        Index("ix_memo_visibility_created", "visibility", "created_ts"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     uid = Column(String(100), unique=True, index=True, nullable=False)
@@ -57,12 +61,54 @@ class Memo(Base):
     relations = relationship("MemoRelation", foreign_keys="[MemoRelation.memo_id]", back_populates="memo", cascade="all, delete-orphan")
 
 
+class MemoTag(Base):
+    __tablename__ = "memo_tag"
+    __table_args__ = (
+        UniqueConstraint("memo_id", "tag", name="uq_memo_tag_memo_tag"),
+        Index("ix_memo_tag_tag_creator_timeline", "tag", "creator_id", "created_ts", "memo_id"),
+        Index("ix_memo_tag_tag_timeline", "tag", "created_ts", "memo_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    memo_id = Column(Integer, ForeignKey("memo.id", ondelete="CASCADE"), nullable=False)
+    creator_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
+    tag = Column(String(255), nullable=False)
+    created_ts = Column(DateTime(timezone=True))
+
+
+class UserMemoStats(Base):
+    __tablename__ = "user_memo_stats"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), unique=True, nullable=False)
+    memo_count = Column(Integer, nullable=False, default=0)
+    pinned_count = Column(Integer, nullable=False, default=0)
+    public_count = Column(Integer, nullable=False, default=0)
+    protected_count = Column(Integer, nullable=False, default=0)
+    private_count = Column(Integer, nullable=False, default=0)
+
+
+class UserTagCount(Base):
+    __tablename__ = "user_tag_count"
+    __table_args__ = (
+        UniqueConstraint("user_id", "tag", name="uq_user_tag_count_user_tag"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
+    tag = Column(String(255), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+
 class Attachment(Base):
     __tablename__ = "attachment"
+    __table_args__ = (
+        Index("ix_attachment_memo_created", "memo_id", "created_ts"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     uid = Column(String(100), unique=True, index=True, nullable=False)
-    creator_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
+    creator_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False, index=True)
     memo_id = Column(Integer, ForeignKey("memo.id", ondelete="CASCADE"), nullable=True)
     filename = Column(String(500), nullable=False)
     file_type = Column(String(100))
@@ -82,7 +128,7 @@ class Reaction(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     creator_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
-    memo_id = Column(Integer, ForeignKey("memo.id", ondelete="CASCADE"), nullable=False)
+    memo_id = Column(Integer, ForeignKey("memo.id", ondelete="CASCADE"), nullable=False, index=True)
     reaction = Column(String(50), nullable=False)
     created_ts = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -94,8 +140,8 @@ class MemoRelation(Base):
     __tablename__ = "memo_relation"
     
     id = Column(Integer, primary_key=True, index=True)
-    memo_id = Column(Integer, ForeignKey("memo.id", ondelete="CASCADE"), nullable=False)
-    related_memo_id = Column(Integer, ForeignKey("memo.id", ondelete="CASCADE"), nullable=False)
+    memo_id = Column(Integer, ForeignKey("memo.id", ondelete="CASCADE"), nullable=False, index=True)
+    related_memo_id = Column(Integer, ForeignKey("memo.id", ondelete="CASCADE"), nullable=False, index=True)
     type = Column(String(50), nullable=False)
     created_ts = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -107,8 +153,9 @@ class PersonalAccessToken(Base):
     __tablename__ = "personal_access_token"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
-    token = Column(String(255), unique=True, index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    token_hint = Column(String(20))
     description = Column(String(500))
     issued_at = Column(DateTime(timezone=True), server_default=func.now())
     expires_at = Column(DateTime(timezone=True))
@@ -120,7 +167,7 @@ class UserSetting(Base):
     __tablename__ = "user_setting"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False, index=True)
     key = Column(String(100), nullable=False)
     value = Column(Text)
     created_ts = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,14 +1,54 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import settings
 
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True
-)
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers proceed while a write is in progress; NORMAL sync is durable
+    # across application crashes and only risks the last commits on power loss.
+    if settings.SQLITE_WAL:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.close()
+
+
+def build_engine(url: str) -> AsyncEngine:
+    database_url = make_url(url)
+    options = {
+        "echo": settings.DEBUG,
+        "future": True,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    
+    is_sqlite = database_url.get_backend_name() == "sqlite"
+    in_memory = is_sqlite and database_url.database in (None, "", ":memory:")
+    if not in_memory:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+        if is_sqlite:
+            # File databases default to NullPool, which would reopen the file and
+            # reapply the pragmas for every session.
+            options["poolclass"] = AsyncAdaptedQueuePool
+    
+    db_engine = create_async_engine(url, **options)
+    if is_sqlite:
+        event.listen(db_engine.sync_engine, "connect", set_sqlite_pragmas)
+    return db_engine
+
+
+engine = build_engine(settings.DATABASE_URL)
+read_engine = build_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else engine
 
 AsyncSessionLocal = sessionmaker(
     engine,
@@ -18,7 +58,29 @@ AsyncSessionLocal = sessionmaker(
     autoflush=False
 )
 
-Base = declarative_base()
+AsyncReadSessionLocal = sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False
+)
+
+class ModelBase:
+    # Server-generated columns (ids, created_ts, updated_ts) come back through
+    # INSERT/UPDATE ... RETURNING instead of a follow-up SELECT.
+    __mapper_args__ = {"eager_defaults": True}
+
+
+Base = declarative_base(cls=ModelBase)
+
+
+@event.listens_for(Base, "init", propagate=True)
+def init_updated_ts(target, args, kwargs):
+    # A new row has never been updated. Saying so up front stops eager_defaults from
+    # reading the onupdate-only updated_ts column back with a SELECT after the INSERT.
+    if "updated_ts" in target.__mapper__.columns:
+        kwargs.setdefault("updated_ts", None)
 
 
 async def get_db():
@@ -27,3 +89,17 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+async def get_read_db():
+    async with AsyncReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def dispose_engines():
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
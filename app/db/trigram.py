@@ -0,0 +1,400 @@
+from sqlalchemy import select, text, func, case, false, literal, or_, bindparam, Float, String
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncConnection, AsyncEngine
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from app.db.models import Memo, MemoTag, MemoVisibility
+from app.config import settings
+from starlette.concurrency import run_in_threadpool
+import heapq
+import json
+import math
+import os
+import re
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 2
+MAX_WORDS_PER_TERM = 16
+
+
+def index_words(content: str, tags: Optional[Iterable[str]] = None) -> Set[str]:
+    words = set(re.findall(r'\w+', content.lower()))
+    for tag in tags or []:
+        words.update(re.findall(r'\w+', tag.lower()))
+    return words
+
+
+def memo_meta(creator_id: int, visibility, tags: Optional[Iterable[str]]) -> tuple:
+    return (creator_id, MemoVisibility(visibility or MemoVisibility.PRIVATE).value, frozenset(tags or []))
+
+
+def trigrams(word: str) -> frozenset:
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TrigramIndex:
+    def __init__(self):
+        self.memo_words: Dict[int, Set[str]] = {}
+        self.memo_meta: Dict[int, tuple] = {}
+        self.word_memos: Dict[str, Set[int]] = defaultdict(set)
+        self.word_trigrams: Dict[str, frozenset] = {}
+        self.trigram_words: Dict[str, Set[str]] = defaultdict(set)
+    
+    def __len__(self) -> int:
+        return len(self.memo_words)
+    
+    def clear(self):
+        self.memo_words.clear()
+        self.memo_meta.clear()
+        self.word_memos.clear()
+        self.word_trigrams.clear()
+        self.trigram_words.clear()
+    
+    def add(self, memo_id: int, words: Set[str], meta: tuple):
+        self.remove(memo_id)
+        self.memo_words[memo_id] = words
+        self.memo_meta[memo_id] = meta
+        for word in words:
+            self.word_memos[word].add(memo_id)
+            if word not in self.word_trigrams:
+                grams = trigrams(word)
+                self.word_trigrams[word] = grams
+                for gram in grams:
+                    self.trigram_words[gram].add(word)
+    
+    def remove(self, memo_id: int):
+        words = self.memo_words.pop(memo_id, None)
+        self.memo_meta.pop(memo_id, None)
+        if not words:
+            return
+        for word in words:
+            memos = self.word_memos[word]
+            memos.discard(memo_id)
+            if memos:
+                continue
+            del self.word_memos[word]
+            for gram in self.word_trigrams.pop(word):
+                gram_words = self.trigram_words[gram]
+                gram_words.discard(word)
+                if not gram_words:
+                    del self.trigram_words[gram]
+    
+    def similar_words(self, term: str, threshold: float) -> List[Tuple[str, float]]:
+        query = trigrams(term)
+        # Any word reaching the threshold shares at least min_overlap trigrams with the
+        # term, so it must appear in one of the rarest len - min_overlap + 1 postings.
+        min_overlap = max(1, math.ceil(threshold * len(query)))
+        rarest = sorted(query, key=lambda gram: len(self.trigram_words.get(gram, ())))
+        candidates = set()
+        for gram in rarest[:len(query) - min_overlap + 1]:
+            candidates.update(self.trigram_words.get(gram, ()))
+        
+        matches = []
+        for word in candidates:
+            grams = self.word_trigrams[word]
+            shared = len(query & grams)
+            similarity = shared / (len(query) + len(grams) - shared)
+            if similarity >= threshold:
+                matches.append((word, similarity))
+        return heapq.nlargest(MAX_WORDS_PER_TERM, matches, key=lambda match: match[1])
+    
+    def search(
+        self,
+        terms: List[str],
+        threshold: float,
+        limit: int,
+        max_postings: int,
+        allowed: Optional[Callable[[tuple], bool]] = None,
+        after: Optional[Tuple[float, int]] = None
+    ) -> List[Tuple[int, float]]:
+        # Memos the caller may not see are dropped before the postings budget and the
+        # top-N cut, so other users' memos can never crowd out visible matches.
+        scores: Dict[int, float] = defaultdict(float)
+        for term in terms:
+            best: Dict[int, float] = {}
+            budget = max_postings
+            for word, similarity in self.similar_words(term, threshold):
+                memos = self.word_memos[word]
+                if allowed is not None:
+                    memos = [memo_id for memo_id in memos if allowed(self.memo_meta[memo_id])]
+                if len(memos) > budget:
+                    memos = heapq.nlargest(budget, memos)
+                for memo_id in memos:
+                    if similarity > best.get(memo_id, 0.0):
+                        best[memo_id] = similarity
+                budget -= len(memos)
+                if budget <= 0:
+                    break
+            for memo_id, similarity in best.items():
+                scores[memo_id] += similarity / len(terms)
+        
+        # Scores are rounded to what the database sees so a (score, id) cursor from the
+        # previous page picks up exactly where that page ended.
+        ranked = ((memo_id, round(score, 6)) for memo_id, score in scores.items())
+        if after is not None:
+            ranked = ((memo_id, score) for memo_id, score in ranked if (score, memo_id) < after)
+        return heapq.nlargest(limit, ranked, key=lambda item: (item[1], item[0]))
+    
+    def dump(self) -> dict:
+        return {
+            str(memo_id): [sorted(words), *self.memo_meta[memo_id][:2], sorted(self.memo_meta[memo_id][2])]
+            for memo_id, words in self.memo_words.items()
+        }
+    
+    def load(self, data: dict):
+        self.clear()
+        for memo_id, (words, creator_id, visibility, tags) in data.items():
+            self.add(int(memo_id), set(words), memo_meta(creator_id, visibility, tags))
+
+
+class FuzzyIndex:
+    postgres_content_index = "ix_memo_content_trgm"
+    postgres_tag_index = "ix_memo_tag_tag_trgm"
+    
+    def __init__(self):
+        self.index = TrigramIndex()
+        self.loaded = False
+        self.dirty = False
+        self.path: Optional[str] = None
+        self.synced: Optional[list] = None
+        self.checked_at = 0.0
+        self.saved_at = 0.0
+    
+    def dialect_name(self, db: AsyncSession) -> str:
+        return db.get_bind().dialect.name
+    
+    def is_enabled(self) -> bool:
+        return settings.FUZZY_SEARCH
+    
+    def uses_memory_index(self, dialect: str) -> bool:
+        return dialect != "postgresql"
+    
+    def create_statements(self, dialect: str) -> List[str]:
+        if dialect == "postgresql":
+            return [
+                "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+                f"CREATE INDEX IF NOT EXISTS {self.postgres_content_index} "
+                "ON memo USING GIN (content gin_trgm_ops)",
+                f"CREATE INDEX IF NOT EXISTS {self.postgres_tag_index} "
+                "ON memo_tag USING GIN (tag gin_trgm_ops)",
+            ]
+        return []
+    
+    def drop_statements(self, dialect: str) -> List[str]:
+        if dialect == "postgresql":
+            return [
+                f"DROP INDEX IF EXISTS {self.postgres_tag_index}",
+                f"DROP INDEX IF EXISTS {self.postgres_content_index}",
+            ]
+        return []
+    
+    def index_path(self, engine: AsyncEngine) -> Optional[str]:
+        if settings.FUZZY_INDEX_PATH:
+            return settings.FUZZY_INDEX_PATH
+        database = engine.url.database
+        if engine.dialect.name == "sqlite" and database and database != ":memory:":
+            return f"{database}.trigram.json"
+        return None
+    
+    async def signature(self, conn: AsyncConnection) -> list:
+        result = await conn.execute(
+            select(func.count(Memo.id), func.max(Memo.id), func.max(func.coalesce(Memo.updated_ts, Memo.created_ts)))
+        )
+        count, max_id, last_change = result.one()
+        return [count, max_id, str(last_change) if last_change is not None else None]
+    
+    async def load(self, engine: AsyncEngine):
+        if not self.is_enabled() or not self.uses_memory_index(engine.dialect.name):
+            return
+        
+        self.path = self.index_path(engine)
+        async with engine.connect() as conn:
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path) as f:
+                        data = json.load(f)
+                    if data.get("version") == INDEX_VERSION:
+                        self.index.load(data["memos"])
+                        self.synced = data["signature"]
+                        self.loaded = True
+                        logger.info(f"Loaded fuzzy search index for {len(self.index)} memos from {self.path}")
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Ignoring unreadable fuzzy search index {self.path}: {e}")
+            
+            # A file left behind by a crash or another worker only needs the memos
+            # changed since it was written; a full rebuild is for when there is none.
+            if self.loaded:
+                await self.refresh(conn)
+            else:
+                await self.rebuild(conn)
+        await self.save()
+    
+    async def rebuild(self, conn: AsyncConnection):
+        self.index.clear()
+        self.synced = await self.signature(conn)
+        result = await conn.stream(
+            select(Memo.id, Memo.content, Memo.tags, Memo.creator_id, Memo.visibility).execution_options(yield_per=1000)
+        )
+        async for memo_id, content, tags, creator_id, visibility in result:
+            self.index.add(memo_id, index_words(content, tags), memo_meta(creator_id, visibility, tags))
+        self.loaded = True
+        self.dirty = True
+        self.checked_at = time.monotonic()
+        logger.info(f"Fuzzy search index rebuilt for {len(self.index)} memos")
+    
+    async def refresh(self, conn: AsyncConnection):
+        # Every worker keeps its own index, so each one catches up on writes made
+        # elsewhere: memos created or edited since the last sync are re-read, and ids
+        # are reconciled only when the row count shows memos were deleted.
+        self.checked_at = time.monotonic()
+        signature = await self.signature(conn)
+        if signature == self.synced:
+            return
+        
+        _, max_id, last_change = self.synced
+        changed = Memo.id > (max_id or 0)
+        if last_change is not None:
+            changed = or_(
+                changed,
+                func.coalesce(Memo.updated_ts, Memo.created_ts) >= bindparam("last_change", last_change, type_=String)
+            )
+        result = await conn.stream(
+            select(Memo.id, Memo.content, Memo.tags, Memo.creator_id, Memo.visibility)
+            .where(changed)
+            .execution_options(yield_per=1000)
+        )
+        updated = 0
+        async for memo_id, content, tags, creator_id, visibility in result:
+            self.index.add(memo_id, index_words(content, tags), memo_meta(creator_id, visibility, tags))
+            updated += 1
+        
+        removed = 0
+        if len(self.index) != signature[0]:
+            existing = set((await conn.execute(select(Memo.id))).scalars().all())
+            for memo_id in [memo_id for memo_id in self.index.memo_words if memo_id not in existing]:
+                self.index.remove(memo_id)
+                removed += 1
+        
+        self.synced = signature
+        self.dirty = True
+        logger.info(f"Fuzzy search index caught up: {updated} memos updated, {removed} removed")
+    
+    async def maintain(self, db: AsyncSession):
+        if time.monotonic() - self.checked_at < settings.FUZZY_INDEX_REFRESH_SECONDS:
+            return
+        await self.refresh(await db.connection())
+        if time.monotonic() - self.saved_at >= settings.FUZZY_INDEX_SAVE_SECONDS:
+            await self.save()
+    
+    async def save(self):
+        if not self.path or not self.loaded or not self.dirty:
+            return
+        # Workers may save at the same time, so each writes its own temporary file and
+        # the last rename wins; any of them is a valid starting point for the next load.
+        data = {"version": INDEX_VERSION, "signature": self.synced, "memos": self.index.dump()}
+        self.dirty = False
+        self.saved_at = time.monotonic()
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        
+        def write():
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        
+        await run_in_threadpool(write)
+    
+    async def close(self):
+        await self.save()
+    
+    def index_memo(
+        self,
+        db: AsyncSession,
+        memo_id: int,
+        content: str,
+        tags: Optional[List[str]],
+        creator_id: int,
+        visibility
+    ):
+        if not self.loaded or not self.uses_memory_index(self.dialect_name(db)):
+            return
+        self.index.add(memo_id, index_words(content, tags), memo_meta(creator_id, visibility, tags))
+        self.dirty = True
+    
+    def remove_memo(self, db: AsyncSession, memo_id: int):
+        if not self.loaded or not self.uses_memory_index(self.dialect_name(db)):
+            return
+        self.index.remove(memo_id)
+        self.dirty = True
+    
+    async def match(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int,
+        viewer_id: Optional[int] = None,
+        creator_id: Optional[int] = None,
+        visibility: Optional[str] = None,
+        tag: Optional[str] = None,
+        after: Optional[Tuple[float, int]] = None
+    ):
+        # Returns (condition, score) with higher scores meaning closer matches; None
+        # means fuzzy search is unavailable and the caller should search normally.
+        # Results are ordered by (score, id); the in-memory index returns the next
+        # `limit` candidates after `after` that pass the same filters as the query.
+        if not self.is_enabled():
+            return None
+        
+        threshold = settings.FUZZY_SIMILARITY_THRESHOLD
+        if self.dialect_name(db) == "postgresql":
+            await db.execute(
+                text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true), "
+                     "set_config('pg_trgm.similarity_threshold', :threshold, true)"),
+                {"threshold": str(threshold)}
+            )
+            tag_score = (
+                select(func.max(func.similarity(MemoTag.tag, query)))
+                .where(MemoTag.memo_id == Memo.id)
+                .scalar_subquery()
+            )
+            condition = or_(
+                Memo.content.op("%>")(query),
+                Memo.id.in_(select(MemoTag.memo_id).where(MemoTag.tag.op("%")(query)))
+            )
+            score = func.greatest(func.word_similarity(query, Memo.content), func.coalesce(tag_score, 0.0))
+            return condition, score
+        
+        if not self.loaded:
+            return None
+        await self.maintain(db)
+        
+        terms = sorted(set(re.findall(r'\w+', query.lower())))
+        if not terms:
+            return None
+        
+        def allowed(meta: tuple) -> bool:
+            owner, memo_visibility, memo_tags = meta
+            if viewer_id is None:
+                if memo_visibility != MemoVisibility.PUBLIC.value:
+                    return False
+            elif memo_visibility == MemoVisibility.PRIVATE.value and owner != viewer_id:
+                return False
+            if creator_id and owner != creator_id:
+                return False
+            if visibility and memo_visibility != visibility:
+                return False
+            return not tag or tag in memo_tags
+        
+        hits = self.index.search(
+            terms, threshold, max(limit, settings.FUZZY_MAX_CANDIDATES), settings.FUZZY_MAX_POSTINGS,
+            allowed=allowed, after=after
+        )
+        if not hits:
+            return false(), literal(0.0, Float)
+        scores = dict(hits)
+        return Memo.id.in_(list(scores)), case(scores, value=Memo.id, else_=0.0)
+
+
+fuzzy_index = FuzzyIndex()
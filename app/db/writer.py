@@ -0,0 +1,121 @@
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import AsyncSessionLocal
+from app.config import settings
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+Write = Callable[[AsyncSession], Awaitable[Any]]
+
+
+class GroupCommitWriter:
+    def __init__(self, window: float, max_batch: int, enabled: bool = False):
+        self.window = window
+        self.max_batch = max_batch
+        self.enabled = enabled
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.writes = 0
+        self.failures = 0
+        self.largest_batch = 0
+    
+    def start(self):
+        if self.task is None:
+            self.queue = asyncio.Queue()
+            self.task = asyncio.get_running_loop().create_task(self.run())
+    
+    async def stop(self):
+        if self.task is None:
+            return
+        await self.queue.put(None)
+        await self.task
+        self.task = None
+        self.queue = None
+    
+    async def submit(self, write: Write) -> Any:
+        # write adds rows through the session it is given and returns the mapped instance
+        # the caller wants back, resolved once the whole batch has committed.
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((write, future))
+        return await future
+    
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            if item is None:
+                break
+            
+            batch = [item]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            try:
+                await self.commit_batch(batch)
+            except Exception as e:
+                logger.error(f"Group commit of {len(batch)} writes failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+    
+    async def commit_batch(self, batch: List[Tuple[Write, asyncio.Future]]):
+        outcomes = []
+        async with AsyncSessionLocal() as session:
+            for write, future in batch:
+                if future.cancelled():
+                    continue
+                # Each write runs in its own savepoint so one failing insert is reported to
+                # its caller without discarding the rest of the batch.
+                try:
+                    async with session.begin_nested():
+                        result = await write(session)
+                        await session.flush()
+                    outcomes.append((future, result, None))
+                except Exception as e:
+                    self.failures += 1
+                    outcomes.append((future, None, e))
+            await session.commit()
+        
+        self.batches += 1
+        self.writes += len(outcomes)
+        self.largest_batch = max(self.largest_batch, len(outcomes))
+        for future, result, error in outcomes:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+    
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "batches": self.batches,
+            "writes": self.writes,
+            "failures": self.failures,
+            "avg_batch": self.writes / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+        }
+
+
+group_writer = GroupCommitWriter(
+    window=settings.GROUP_COMMIT_WINDOW_MS / 1000,
+    max_batch=settings.GROUP_COMMIT_MAX_BATCH,
+    enabled=settings.GROUP_COMMIT_ENABLED
+)
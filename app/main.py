@@ -1,11 +1,32 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.config import settings
 from app.api.v1 import api_router
+from app.core.pagination import InvalidCursorError, NEXT_CURSOR_HEADER
+from app.core.security import PasswordHasherBusyError, password_hasher
+from app.db.session import engine, read_engine, dispose_engines
+from app.db.trigram import fuzzy_index
+from app.db.writer import group_writer
+from app.core.render_pool import render_pool
+from app.core.ratelimit import RateLimitMiddleware, rate_limiter, admission_controller
+from contextlib import asynccontextmanager
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await fuzzy_index.load(engine)
+    yield
+    await group_writer.stop()
+    render_pool.shutdown()
+    password_hasher.shutdown()
+    await fuzzy_index.close()
+    await dispose_engines()
 
 
 def create_app() -> FastAPI:
     app = FastAPI(
+        lifespan=lifespan,
         title=settings.APP_NAME,
         version=settings.APP_VERSION,
         debug=settings.DEBUG,
@@ -14,14 +35,36 @@ def create_app() -> FastAPI:
         openapi_url="/api/openapi.json"
     )
     
+    # Added before CORS so that CORS wraps it and rejected requests still carry CORS headers.
+    admission_controller.watch_pool("write", engine, settings.DB_MAX_OVERFLOW)
+    if read_engine is not engine:
+        admission_controller.watch_pool("read", read_engine, settings.DB_MAX_OVERFLOW)
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter, admission=admission_controller)
+    
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.CORS_ORIGINS,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "Retry-After"],
     )
     
+    @app.exception_handler(InvalidCursorError)
+    async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"detail": str(exc)}
+        )
+    
+    @app.exception_handler(PasswordHasherBusyError)
+    async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusyError):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": str(exc)},
+            headers={"Retry-After": "1"}
+        )
+    
     app.include_router(api_router, prefix="/api/v1")
     
     return app
@@ -76,6 +76,11 @@ class MemoUpdate(BaseModel):
     pinned: Optional[bool] = None
 
 
+class MemoRendered(BaseModel):
+    html: str
+    preview: str
+
+
 class MemoResponse(MemoBase):
     id: int
     uid: str
@@ -83,11 +88,65 @@ class MemoResponse(MemoBase):
     creator: UserResponse
     created_ts: datetime
     updated_ts: Optional[datetime] = None
+    rendered: Optional[MemoRendered] = None
     
     class Config:
         from_attributes = True
 
 
+class MemoRenderResponse(MemoRendered):
+    id: int
+
+
+class MemoBatchRenderRequest(BaseModel):
+    memo_ids: List[int] = Field(..., min_length=1)
+
+
+class MemoImportRelation(BaseModel):
+    related_uid: str
+    type: str = Field("REFERENCE", max_length=50)
+
+
+class MemoImportItem(MemoBase):
+    uid: Optional[str] = Field(None, min_length=1, max_length=100)
+    created_ts: Optional[datetime] = None
+    updated_ts: Optional[datetime] = None
+    relations: List[MemoImportRelation] = []
+
+
+class MemoImportError(BaseModel):
+    index: int
+    uid: Optional[str] = None
+    error: str
+
+
+class MemoImportResponse(BaseModel):
+    imported: int
+    failed: int
+    relations: int
+    errors: List[MemoImportError] = []
+    errors_truncated: bool = False
+
+
+class MatchSpan(BaseModel):
+    start: int
+    end: int
+
+
+class MemoSnippetResponse(BaseModel):
+    id: int
+    uid: str
+    creator_id: int
+    visibility: MemoVisibility
+    tags: Optional[List[str]] = []
+    pinned: bool
+    created_ts: datetime
+    updated_ts: Optional[datetime] = None
+    content_length: int
+    snippet: str
+    matches: List[MatchSpan] = []
+
+
 class AttachmentBase(BaseModel):
     filename: str
     file_type: Optional[str] = None
@@ -128,7 +187,7 @@ class PersonalAccessTokenCreate(BaseModel):
 
 class PersonalAccessTokenResponse(BaseModel):
     id: int
-    token: str
+    token_hint: Optional[str] = None
     description: Optional[str] = None
     issued_at: datetime
     expires_at: Optional[datetime] = None
@@ -137,6 +196,10 @@ class PersonalAccessTokenResponse(BaseModel):
         from_attributes = True
 
 
+class PersonalAccessTokenCreateResponse(PersonalAccessTokenResponse):
+    token: str
+
+
 class UserSettingBase(BaseModel):
     key: str
     value: Optional[str] = None
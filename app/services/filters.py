@@ -0,0 +1,25 @@
+from sqlalchemy import and_, or_
+from typing import Optional
+from app.db.models import Memo, MemoTag, MemoVisibility
+
+
+TAG_TIMELINE_KEYS = [(MemoTag.created_ts, True), (MemoTag.memo_id, True)]
+
+
+def join_tag(query, tag: str, creator_id: Optional[int] = None):
+    # memo_tag mirrors each memo's creator and created_ts, so a tag timeline ordered by
+    # TAG_TIMELINE_KEYS is a range scan of its index instead of a walk over every memo
+    # of the creator. Its cursors carry the same values as the memo timeline's.
+    condition = and_(MemoTag.memo_id == Memo.id, MemoTag.tag == tag)
+    if creator_id:
+        condition = and_(condition, MemoTag.creator_id == creator_id)
+    return query.join(MemoTag, condition)
+
+
+def visibility_filter(viewer_id: Optional[int] = None):
+    if viewer_id is None:
+        return Memo.visibility == MemoVisibility.PUBLIC
+    return or_(
+        Memo.visibility.in_([MemoVisibility.PUBLIC, MemoVisibility.PROTECTED]),
+        and_(Memo.visibility == MemoVisibility.PRIVATE, Memo.creator_id == viewer_id)
+    )
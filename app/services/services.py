@@ -1,11 +1,76 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, and_, or_
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
-from app.db.models import User, Memo, Attachment, Reaction, MemoRelation, PersonalAccessToken, UserSetting, InstanceSetting
-from app.schemas.schemas import MemoCreate, MemoUpdate, UserCreate, UserUpdate, PersonalAccessTokenCreate
-from datetime import datetime
+from sqlalchemy import select, insert, delete, and_, or_, literal, union_all, func, bindparam, String
+from sqlalchemy.dialects import sqlite, postgresql, mysql
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import defer, selectinload
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from app.db.models import User, Memo, MemoTag, MemoVisibility, UserMemoStats, UserTagCount, Attachment, Reaction, MemoRelation, PersonalAccessToken, UserSetting, InstanceSetting
+from app.db.fulltext import fulltext_index
+from app.db.trigram import fuzzy_index
+from app.db.writer import group_writer
+from app.services.filters import TAG_TIMELINE_KEYS, join_tag, visibility_filter
+from app.core.pagination import Page, decode_cursor, paginate, sqlite_timestamp
+from app.core.cache import pat_cache, query_cache, user_cache
+from app.core.security import hash_pat_token
+from app.core.markdown import markdown_renderer
+from app.core.render_pool import render_pool
+from app.core.archive import ArchiveWriter
+from app.config import settings
+from app.schemas.schemas import MemoCreate, MemoImportItem, MemoImportRelation, MemoUpdate, UserCreate, UserUpdate, PersonalAccessTokenCreate
+from datetime import datetime, timedelta, timezone
+from pydantic import ValidationError
+from pathlib import Path
+import json
+import os
+import tempfile
+import time
 import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+MEMO_TIMELINE_KEYS = [(Memo.created_ts, True), (Memo.id, True)]
+MEMO_EXPORT_KEYS = [(Memo.created_ts, False), (Memo.id, False)]
+
+
+async def submit_write(db: AsyncSession, write):
+    # The request session may already hold a pooled connection (loading the user does);
+    # release it first, or a burst of requests waiting on the writer can hold every
+    # connection the writer needs to make progress.
+    await db.commit()
+    return await db.merge(await group_writer.submit(write), load=False)
+
+
+async def add_and_commit(db: AsyncSession, instance):
+    if group_writer.enabled:
+        async def write(session: AsyncSession):
+            session.add(instance)
+            return instance
+        
+        return await submit_write(db, write)
+    db.add(instance)
+    await db.commit()
+    return instance
+
+
+async def upsert_increment(db: AsyncSession, model, key_columns: List[str], rows: List[dict]):
+    dialect = db.get_bind().dialect.name
+    value_columns = [column for column in rows[0] if column not in key_columns]
+    
+    if dialect == "mysql":
+        stmt = mysql.insert(model)
+        stmt = stmt.on_duplicate_key_update({
+            column: getattr(model, column) + stmt.inserted[column] for column in value_columns
+        })
+    else:
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={column: getattr(model, column) + stmt.excluded[column] for column in value_columns}
+        )
+    
+    await db.execute(stmt, rows)
 
 
 class UserService:
@@ -23,7 +88,6 @@ class UserService:
         )
         self.db.add(db_user)
         await self.db.commit()
-        await self.db.refresh(db_user)
         return db_user
     
     async def get_user_by_id(self, user_id: int) -> Optional[User]:
@@ -39,18 +103,107 @@ class UserService:
         return result.scalar_one_or_none()
     
     async def update_user(self, user_id: int, user_data: UserUpdate) -> Optional[User]:
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        # The authenticated user is usually already in the session's identity map.
+        user = await self.db.get(User, user_id)
         if user:
             for field, value in user_data.model_dump(exclude_unset=True).items():
                 setattr(user, field, value)
             await self.db.commit()
-            await self.db.refresh(user)
+            await query_cache.invalidate_creator(user.id)
+            await user_cache.invalidate(user.id)
         return user
     
-    async def list_users(self, skip: int = 0, limit: int = 100) -> List[User]:
-        result = await self.db.execute(select(User).offset(skip).limit(limit))
+    async def update_password_hash(self, user: User, password_hash: str):
+        user.password_hash = password_hash
+        await self.db.commit()
+        await user_cache.invalidate(user.id)
+    
+    async def list_users(self, skip: int = 0, limit: int = 100, cursor: Optional[list] = None) -> Page:
+        return await paginate(self.db, select(User), [(User.id, False)], cursor=cursor, skip=skip, limit=limit)
+
+
+class MemoStatsService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def apply_memo_change(self, creator_id: int, before: Optional[tuple], after: Optional[tuple]):
+        await self.apply_memo_changes(creator_id, [(before, after)])
+    
+    async def apply_memo_changes(self, creator_id: int, changes: List[Tuple[Optional[tuple], Optional[tuple]]]):
+        counts = {"memo_count": 0, "pinned_count": 0, "public_count": 0, "protected_count": 0, "private_count": 0}
+        tag_deltas = {}
+        
+        for before, after in changes:
+            for state, sign in ((before, -1), (after, 1)):
+                if state is None:
+                    continue
+                visibility, pinned, tags = state
+                counts["memo_count"] += sign
+                if pinned:
+                    counts["pinned_count"] += sign
+                counts[f"{visibility.lower()}_count"] += sign
+                for tag in tags:
+                    tag_deltas[tag] = tag_deltas.get(tag, 0) + sign
+        
+        if any(counts.values()):
+            await upsert_increment(self.db, UserMemoStats, ["user_id"], [{"user_id": creator_id, **counts}])
+        
+        tag_rows = [
+            {"user_id": creator_id, "tag": tag, "count": delta}
+            for tag, delta in sorted(tag_deltas.items()) if delta
+        ]
+        if tag_rows:
+            await upsert_increment(self.db, UserTagCount, ["user_id", "tag"], tag_rows)
+            if any(row["count"] < 0 for row in tag_rows):
+                await self.db.execute(
+                    delete(UserTagCount).where(and_(UserTagCount.user_id == creator_id, UserTagCount.count <= 0))
+                )
+    
+    async def get_tags(self, creator_id: Optional[int] = None) -> List[str]:
+        query = select(UserTagCount.tag).where(UserTagCount.count > 0).distinct().order_by(UserTagCount.tag)
+        if creator_id:
+            query = query.where(UserTagCount.user_id == creator_id)
+        result = await self.db.execute(query)
         return result.scalars().all()
+    
+    async def suggest_tags(self, creator_id: int, prefix: str = "", limit: int = 10) -> List[dict]:
+        query = (
+            select(UserTagCount.tag, UserTagCount.count)
+            .where(and_(UserTagCount.user_id == creator_id, UserTagCount.count > 0))
+            .order_by(UserTagCount.count.desc(), UserTagCount.tag)
+            .limit(limit)
+        )
+        if prefix:
+            query = query.where(UserTagCount.tag.startswith(prefix, autoescape=True))
+        result = await self.db.execute(query)
+        return [{"tag": tag, "count": count} for tag, count in result.all()]
+    
+    async def get_stats(self, creator_id: Optional[int] = None) -> dict:
+        query = select(
+            func.coalesce(func.sum(UserMemoStats.memo_count), 0),
+            func.coalesce(func.sum(UserMemoStats.pinned_count), 0),
+            func.coalesce(func.sum(UserMemoStats.public_count), 0),
+            func.coalesce(func.sum(UserMemoStats.protected_count), 0),
+            func.coalesce(func.sum(UserMemoStats.private_count), 0)
+        )
+        if creator_id:
+            query = query.where(UserMemoStats.user_id == creator_id)
+        result = await self.db.execute(query)
+        total, pinned, public, protected, private = result.one()
+        
+        tags = await self.get_tags(creator_id)
+        
+        return {
+            "total_memos": total,
+            "pinned_memos": pinned,
+            "visibility_counts": {
+                MemoVisibility.PUBLIC.value: public,
+                MemoVisibility.PROTECTED.value: protected,
+                MemoVisibility.PRIVATE.value: private
+            },
+            "total_tags": len(tags),
+            "unique_tags": tags
+        }
 
 
 class MemoService:
@@ -58,25 +211,227 @@ class MemoService:
         self.db = db
     
     async def create_memo(self, memo_data: MemoCreate, creator_id: int) -> Memo:
+        payload = markdown_renderer.memo_payload(memo_data.content)
+        if group_writer.enabled:
+            db_memo = await submit_write(
+                self.db, lambda db: MemoService(db)._insert_memo(memo_data, creator_id, payload)
+            )
+        else:
+            db_memo = await self._insert_memo(memo_data, creator_id, payload)
+            await self.db.commit()
+        fuzzy_index.index_memo(self.db, db_memo.id, db_memo.content, db_memo.tags, creator_id, db_memo.visibility)
+        await query_cache.invalidate_creator(creator_id)
+        return db_memo
+    
+    async def _insert_memo(self, memo_data: MemoCreate, creator_id: int, payload: dict) -> Memo:
         db_memo = Memo(
             uid=str(uuid.uuid4()),
             creator_id=creator_id,
             content=memo_data.content,
             visibility=memo_data.visibility,
-            tags=memo_data.tags,
-            pinned=memo_data.pinned
+            tags=self._merge_tags(memo_data.tags, payload["property"]["tags"]),
+            pinned=memo_data.pinned,
+            payload=payload
         )
         self.db.add(db_memo)
-        await self.db.commit()
-        await self.db.refresh(db_memo)
+        await self.db.flush()
+        await fulltext_index.index_memo(self.db, db_memo.id, db_memo.content)
+        await self._sync_memo_tags(db_memo.id, [], db_memo.tags)
+        await MemoStatsService(self.db).apply_memo_change(creator_id, None, self._memo_state(db_memo))
         return db_memo
     
-    async def get_memo_by_id(self, memo_id: int) -> Optional[Memo]:
+    async def import_memos(self, items: AsyncIterator[Any], creator_id: int, new_uids: bool = False) -> dict:
+        summary = {"imported": 0, "failed": 0, "relations": 0, "errors": [], "errors_truncated": False}
+        relations = []
+        # With new_uids every memo gets a fresh UID; the given ones only link relations
+        # within the import, so an export can be loaded again on the same instance.
+        uid_map: Optional[Dict[str, str]] = {} if new_uids else None
+        chunk = []
+        index = -1
+        async for item in items:
+            index += 1
+            if isinstance(item, Exception):
+                self._import_error(summary, index, None, str(item))
+                continue
+            try:
+                memo_data = MemoImportItem.model_validate(item)
+            except ValidationError as e:
+                uid = item.get("uid") if isinstance(item, dict) else None
+                self._import_error(summary, index, uid if isinstance(uid, str) else None, self._validation_message(e))
+                continue
+            chunk.append((index, memo_data))
+            if len(chunk) >= settings.IMPORT_CHUNK_SIZE:
+                await self._import_chunk(chunk, creator_id, summary, relations, uid_map)
+                chunk = []
+        if chunk:
+            await self._import_chunk(chunk, creator_id, summary, relations, uid_map)
+        
+        for start in range(0, len(relations), settings.IMPORT_CHUNK_SIZE):
+            await self._import_relations(relations[start:start + settings.IMPORT_CHUNK_SIZE], creator_id, summary, uid_map)
+        if summary["imported"]:
+            await query_cache.invalidate_creator(creator_id)
+        return summary
+    
+    async def _import_chunk(
+        self,
+        chunk: List[Tuple[int, MemoImportItem]],
+        creator_id: int,
+        summary: dict,
+        relations: list,
+        uid_map: Optional[Dict[str, str]] = None
+    ):
+        given = [memo_data.uid for _, memo_data in chunk if memo_data.uid]
+        existing = set()
+        if given and uid_map is None:
+            result = await self.db.execute(select(Memo.uid).where(Memo.uid.in_(given)))
+            existing = set(result.scalars().all())
+        
+        accepted = []
+        for index, memo_data in chunk:
+            if uid_map is not None:
+                if memo_data.uid in uid_map:
+                    self._import_error(summary, index, memo_data.uid, "Duplicate memo uid in import")
+                    continue
+                uid = str(uuid.uuid4())
+                if memo_data.uid:
+                    uid_map[memo_data.uid] = uid
+            else:
+                uid = memo_data.uid or str(uuid.uuid4())
+                if uid in existing:
+                    self._import_error(summary, index, uid, "Memo uid already exists")
+                    continue
+                existing.add(uid)
+            accepted.append((index, uid, memo_data))
+        if not accepted:
+            return
+        
+        now = datetime.now(timezone.utc)
+        rows = []
+        payloads = render_pool.render_many([memo_data.content for _, _, memo_data in accepted])
+        for _, uid, memo_data in accepted:
+            payload = await payloads.__anext__()
+            rows.append({
+                "uid": uid,
+                "creator_id": creator_id,
+                "content": memo_data.content,
+                "visibility": memo_data.visibility,
+                "tags": self._merge_tags(memo_data.tags, payload["property"]["tags"]),
+                "pinned": memo_data.pinned,
+                "payload": payload,
+                "created_ts": self._import_timestamp(memo_data.created_ts) or now,
+                "updated_ts": self._import_timestamp(memo_data.updated_ts),
+            })
+        
+        # Each table gets one executemany per chunk instead of a round trip per memo,
+        # and the whole chunk lands in a single commit.
+        try:
+            # Rows go through the table rather than the ORM bulk path, which would split
+            # them into separate statements by which optional columns are None. Ids are
+            # matched back by uid: asking the dialect to keep parameter order makes
+            # SQLite fall back to one INSERT per row.
+            dialect = self.db.get_bind().dialect
+            memo_table = Memo.__table__
+            memo_insert = insert(memo_table)
+            tag_insert = insert(MemoTag.__table__)
+            if dialect.name == "sqlite":
+                # SQLAlchemy always writes fractional seconds to SQLite and server defaults
+                # never do; keyset cursors compare the stored text, so match the latter.
+                for row in rows:
+                    row["created_ts"] = sqlite_timestamp(row["created_ts"])
+                    row["updated_ts"] = row["updated_ts"] and sqlite_timestamp(row["updated_ts"])
+                memo_insert = memo_insert.values(
+                    created_ts=bindparam("created_ts", type_=String),
+                    updated_ts=bindparam("updated_ts", type_=String)
+                )
+                tag_insert = tag_insert.values(created_ts=bindparam("created_ts", type_=String))
+            
+            if dialect.insert_executemany_returning:
+                result = await self.db.execute(memo_insert.returning(memo_table.c.uid, memo_table.c.id), rows)
+            else:
+                await self.db.execute(memo_insert, rows)
+                result = await self.db.execute(
+                    select(Memo.uid, Memo.id).where(Memo.uid.in_([row["uid"] for row in rows]))
+                )
+            ids_by_uid = dict(result.all())
+            memo_ids = [ids_by_uid[row["uid"]] for row in rows]
+            
+            await fulltext_index.index_memos(self.db, [(memo_id, row["content"]) for memo_id, row in zip(memo_ids, rows)])
+            tag_rows = [
+                {"memo_id": memo_id, "creator_id": creator_id, "tag": tag, "created_ts": row["created_ts"]}
+                for memo_id, row in zip(memo_ids, rows) for tag in row["tags"]
+            ]
+            if tag_rows:
+                await self.db.execute(tag_insert, tag_rows)
+            await MemoStatsService(self.db).apply_memo_changes(
+                creator_id,
+                [(None, (MemoVisibility(row["visibility"]).value, row["pinned"], set(row["tags"]))) for row in rows]
+            )
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Import of {len(rows)} memos failed: {e}")
+            for index, uid, memo_data in accepted:
+                self._import_error(summary, index, memo_data.uid or uid, "Database error")
+            return
+        
+        summary["imported"] += len(rows)
+        for memo_id, row, (index, uid, memo_data) in zip(memo_ids, rows, accepted):
+            fuzzy_index.index_memo(self.db, memo_id, row["content"], row["tags"], creator_id, row["visibility"])
+            for relation in memo_data.relations:
+                relations.append((index, memo_data.uid or uid, memo_id, relation))
+    
+    async def _import_relations(self, relations: list, creator_id: int, summary: dict, uid_map: Optional[Dict[str, str]] = None):
+        # Relations are resolved after every chunk is in, so a memo may point at one
+        # that appears later in the same import.
+        def target_uid(relation: MemoImportRelation) -> str:
+            if uid_map is None:
+                return relation.related_uid
+            return uid_map.get(relation.related_uid, relation.related_uid)
+        
+        related_uids = {target_uid(relation) for _, _, _, relation in relations}
         result = await self.db.execute(
-            select(Memo)
-            .options(selectinload(Memo.creator))
-            .where(Memo.id == memo_id)
+            select(Memo.uid, Memo.id).where(and_(Memo.uid.in_(related_uids), Memo.creator_id == creator_id))
         )
+        ids_by_uid = dict(result.all())
+        
+        rows = []
+        for index, uid, memo_id, relation in relations:
+            related_id = ids_by_uid.get(target_uid(relation))
+            if related_id is None:
+                self._import_error(summary, index, uid, f"Related memo not found: {relation.related_uid}", failed=False)
+                continue
+            rows.append({"memo_id": memo_id, "related_memo_id": related_id, "type": relation.type})
+        if rows:
+            await self.db.execute(insert(MemoRelation), rows)
+            await self.db.commit()
+            summary["relations"] += len(rows)
+    
+    def _import_error(self, summary: dict, index: int, uid: Optional[str], error: str, failed: bool = True):
+        if failed:
+            summary["failed"] += 1
+        if len(summary["errors"]) < settings.IMPORT_MAX_ERRORS:
+            summary["errors"].append({"index": index, "uid": uid, "error": error})
+        else:
+            summary["errors_truncated"] = True
+    
+    def _validation_message(self, error: ValidationError) -> str:
+        return "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc']) or 'item'}: {detail['msg']}"
+            for detail in error.errors()
+        )
+    
+    def _import_timestamp(self, value: Optional[datetime]) -> Optional[datetime]:
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+    
+    async def get_memo_by_id(self, memo_id: int, with_creator: bool = True) -> Optional[Memo]:
+        query = select(Memo).where(Memo.id == memo_id)
+        if with_creator:
+            query = query.options(selectinload(Memo.creator))
+        result = await self.db.execute(query)
         return result.scalar_one_or_none()
     
     async def get_memo_by_uid(self, uid: str) -> Optional[Memo]:
@@ -87,24 +442,69 @@ class MemoService:
         )
         return result.scalar_one_or_none()
     
-    async def update_memo(self, memo_id: int, memo_data: MemoUpdate) -> Optional[Memo]:
-        result = await self.db.execute(select(Memo).where(Memo.id == memo_id))
-        memo = result.scalar_one_or_none()
+    async def update_memo(self, memo_id: int, memo_data: MemoUpdate, memo: Optional[Memo] = None) -> Optional[Memo]:
+        if memo is None:
+            memo = await self.get_memo_by_id(memo_id, with_creator=False)
         if memo:
-            for field, value in memo_data.model_dump(exclude_unset=True).items():
+            old_content = memo.content
+            old_tags = memo.tags
+            old_state = self._memo_state(memo)
+            old_extracted = self._extracted_tags(memo.payload, old_content)
+            updates = memo_data.model_dump(exclude_unset=True)
+            # An explicit null puts the column back to its default instead of storing NULL.
+            for field, default in (("visibility", MemoVisibility.PRIVATE), ("pinned", False)):
+                if field in updates and updates[field] is None:
+                    updates[field] = default
+            for field, value in updates.items():
                 setattr(memo, field, value)
+            if memo.content != old_content:
+                memo.payload = {**(memo.payload or {}), **markdown_renderer.memo_payload(memo.content, memo.payload)}
+            if memo.content != old_content or "tags" in updates:
+                # Tags written by hand survive content edits; tags taken from the old content do not.
+                manual_tags = updates["tags"] if "tags" in updates else [
+                    tag for tag in old_tags or [] if tag not in old_extracted
+                ]
+                memo.tags = self._merge_tags(manual_tags, self._extracted_tags(memo.payload, memo.content))
+            await fulltext_index.update_memo(self.db, memo.id, old_content, memo.content)
+            await self._sync_memo_tags(memo.id, old_tags, memo.tags)
+            await MemoStatsService(self.db).apply_memo_change(memo.creator_id, old_state, self._memo_state(memo))
             await self.db.commit()
-            await self.db.refresh(memo)
+            fuzzy_index.index_memo(self.db, memo.id, memo.content, memo.tags, memo.creator_id, memo.visibility)
+            await query_cache.invalidate_creator(memo.creator_id)
         return memo
     
-    async def delete_memo(self, memo_id: int) -> bool:
-        result = await self.db.execute(select(Memo).where(Memo.id == memo_id))
-        memo = result.scalar_one_or_none()
-        if memo:
-            await self.db.delete(memo)
-            await self.db.commit()
-            return True
-        return False
+    async def delete_memo(self, memo_id: int, creator_id: Optional[int] = None) -> bool:
+        condition = Memo.id == memo_id
+        if creator_id is not None:
+            condition = and_(condition, Memo.creator_id == creator_id)
+        columns = [Memo.creator_id, Memo.content, Memo.visibility, Memo.pinned, Memo.tags]
+        
+        # The deleted row's columns come back with the DELETE itself where the dialect
+        # allows it, so the memo is never loaded first.
+        if self.db.get_bind().dialect.delete_returning:
+            result = await self.db.execute(
+                delete(Memo).where(condition).returning(*columns).execution_options(synchronize_session=False)
+            )
+            memo = result.first()
+        else:
+            memo = (await self.db.execute(select(*columns).where(condition))).first()
+            if memo:
+                await self.db.execute(delete(Memo).where(Memo.id == memo_id).execution_options(synchronize_session=False))
+        if not memo:
+            return False
+        
+        await self.db.execute(delete(Attachment).where(Attachment.memo_id == memo_id))
+        await self.db.execute(delete(Reaction).where(Reaction.memo_id == memo_id))
+        await self.db.execute(delete(MemoRelation).where(
+            or_(MemoRelation.memo_id == memo_id, MemoRelation.related_memo_id == memo_id)
+        ))
+        await self.db.execute(delete(MemoTag).where(MemoTag.memo_id == memo_id))
+        await fulltext_index.remove_memo(self.db, memo_id, memo.content)
+        await MemoStatsService(self.db).apply_memo_change(memo.creator_id, self._memo_state(memo), None)
+        await self.db.commit()
+        fuzzy_index.remove_memo(self.db, memo_id)
+        await query_cache.invalidate_creator(memo.creator_id)
+        return True
     
     async def list_memos(
         self,
@@ -113,26 +513,91 @@ class MemoService:
         tag: Optional[str] = None,
         pinned: Optional[bool] = None,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[Memo]:
+        limit: int = 100,
+        cursor: Optional[list] = None,
+        viewer_id: Optional[int] = None
+    ) -> Page:
         query = select(Memo).options(selectinload(Memo.creator))
+        keys = MEMO_TIMELINE_KEYS
         
-        conditions = []
+        conditions = [visibility_filter(viewer_id)]
         if creator_id:
             conditions.append(Memo.creator_id == creator_id)
         if visibility:
             conditions.append(Memo.visibility == visibility)
         if tag:
-            conditions.append(Memo.tags.contains([tag]))
+            query = join_tag(query, tag, creator_id)
+            keys = TAG_TIMELINE_KEYS
         if pinned is not None:
             conditions.append(Memo.pinned == pinned)
         
         if conditions:
             query = query.where(and_(*conditions))
         
-        query = query.order_by(Memo.created_ts.desc()).offset(skip).limit(limit)
-        result = await self.db.execute(query)
+        return await paginate(self.db, query, keys, cursor=cursor, skip=skip, limit=limit)
+    
+    async def get_rendered(self, memos: List[Memo]) -> List[dict]:
+        # Reads never write: memos whose stored render is missing or stale are rendered in
+        # memory, and scripts/render_memo_payloads.py stores the result once.
+        return [render async for render in self._renders(memos)]
+    
+    async def get_memos_by_ids(self, memo_ids: List[int], viewer_id: Optional[int] = None) -> List[Memo]:
+        result = await self.db.execute(
+            select(Memo).where(and_(Memo.id.in_(memo_ids), visibility_filter(viewer_id)))
+        )
         return result.scalars().all()
+    
+    async def render_memos(self, memos: List[Memo]) -> AsyncIterator[dict]:
+        renders = self._renders(memos)
+        for memo in memos:
+            render = await renders.__anext__()
+            yield {"id": memo.id, "html": render["html"], "preview": render["preview"]}
+    
+    async def _renders(self, memos: List[Memo]) -> AsyncIterator[dict]:
+        cached = [markdown_renderer.cached_payload(memo.payload, memo.content) for memo in memos]
+        rendered = render_pool.render_many([memo.content for memo, render in zip(memos, cached) if render is None])
+        for render in cached:
+            if render is None:
+                render = (await rendered.__anext__())["render"]
+            yield render
+    
+    def _merge_tags(self, manual_tags: Optional[List[str]], extracted_tags: List[str]) -> List[str]:
+        return list(dict.fromkeys([*(manual_tags or []), *extracted_tags]))
+    
+    def _extracted_tags(self, payload: Optional[dict], content: str) -> List[str]:
+        stored = markdown_renderer.cached_payload(payload, content)
+        if stored is not None and "property" in payload:
+            return payload["property"]["tags"]
+        return markdown_renderer.extract_tags(content)
+    
+    def _memo_state(self, memo) -> tuple:
+        # Rows saved with a NULL visibility before it was normalised count as private.
+        visibility = MemoVisibility(memo.visibility or MemoVisibility.PRIVATE).value
+        return (visibility, bool(memo.pinned), set(memo.tags or []))
+    
+    async def _sync_memo_tags(self, memo_id: int, old_tags: Optional[List[str]], new_tags: Optional[List[str]]):
+        old_set = set(old_tags or [])
+        new_set = set(new_tags or [])
+        
+        removed = old_set - new_set
+        if removed:
+            await self.db.execute(
+                delete(MemoTag).where(and_(MemoTag.memo_id == memo_id, MemoTag.tag.in_(removed)))
+            )
+        
+        added = new_set - old_set
+        if added:
+            rows = union_all(*[
+                select(Memo.id, Memo.creator_id, literal(tag, MemoTag.tag.type), Memo.created_ts)
+                .where(Memo.id == memo_id)
+                for tag in sorted(added)
+            ])
+            await self.db.execute(
+                insert(MemoTag).from_select(
+                    [MemoTag.memo_id, MemoTag.creator_id, MemoTag.tag, MemoTag.created_ts],
+                    rows
+                )
+            )
 
 
 class AttachmentService:
@@ -159,22 +624,153 @@ class AttachmentService:
             storage_type=storage_type,
             reference=reference
         )
-        self.db.add(db_attachment)
-        await self.db.commit()
-        await self.db.refresh(db_attachment)
-        return db_attachment
+        return await add_and_commit(self.db, db_attachment)
     
     async def get_attachment_by_id(self, attachment_id: int) -> Optional[Attachment]:
         result = await self.db.execute(select(Attachment).where(Attachment.id == attachment_id))
         return result.scalar_one_or_none()
     
-    async def list_attachments(self, memo_id: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[Attachment]:
+    async def list_attachments(
+        self,
+        memo_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[list] = None
+    ) -> Page:
         query = select(Attachment)
         if memo_id:
             query = query.where(Attachment.memo_id == memo_id)
-        query = query.offset(skip).limit(limit)
-        result = await self.db.execute(query)
-        return result.scalars().all()
+        keys = [(Attachment.created_ts, True), (Attachment.id, True)]
+        return await paginate(self.db, query, keys, cursor=cursor, skip=skip, limit=limit)
+
+
+class ExportService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def iter_memo_records(self, creator_id: int) -> AsyncIterator[List[dict]]:
+        # Keyset batches keep each query cheap however deep into the account it is, and
+        # clearing the session after each batch keeps memory flat for large accounts.
+        # The rendered payload is not part of a record, so it is never loaded.
+        cursor = None
+        while True:
+            page = await paginate(
+                self.db,
+                select(Memo).where(Memo.creator_id == creator_id).options(defer(Memo.payload)),
+                MEMO_EXPORT_KEYS,
+                cursor=cursor, limit=settings.EXPORT_BATCH_SIZE
+            )
+            if not page.items:
+                return
+            memo_ids = [memo.id for memo in page.items]
+            
+            relations = {}
+            result = await self.db.execute(
+                select(MemoRelation.memo_id, MemoRelation.type, Memo.uid)
+                .join(Memo, Memo.id == MemoRelation.related_memo_id)
+                .where(MemoRelation.memo_id.in_(memo_ids))
+                .order_by(MemoRelation.id)
+            )
+            for memo_id, relation_type, related_uid in result.all():
+                relations.setdefault(memo_id, []).append({"related_uid": related_uid, "type": relation_type})
+            
+            attachments = {}
+            result = await self.db.execute(
+                select(Attachment)
+                .where(Attachment.memo_id.in_(memo_ids))
+                .options(defer(Attachment.payload))
+                .order_by(Attachment.id)
+            )
+            for attachment in result.scalars().all():
+                attachments.setdefault(attachment.memo_id, []).append(self._attachment_record(attachment))
+            
+            yield [
+                {
+                    "uid": memo.uid,
+                    "content": memo.content,
+                    "visibility": MemoVisibility(memo.visibility or MemoVisibility.PRIVATE).value,
+                    "tags": memo.tags or [],
+                    "pinned": bool(memo.pinned),
+                    "created_ts": self._timestamp(memo.created_ts),
+                    "updated_ts": self._timestamp(memo.updated_ts),
+                    "relations": relations.get(memo.id, []),
+                    "attachments": attachments.get(memo.id, []),
+                }
+                for memo in page.items
+            ]
+            self.db.expunge_all()
+            if page.next_cursor is None:
+                return
+            cursor = decode_cursor(page.next_cursor)
+    
+    async def iter_attachments(self, creator_id: int) -> AsyncIterator[List[Tuple[Attachment, Optional[str]]]]:
+        cursor = None
+        while True:
+            page = await paginate(
+                self.db,
+                select(Attachment).where(Attachment.creator_id == creator_id).options(defer(Attachment.payload)),
+                [(Attachment.id, False)],
+                cursor=cursor, limit=settings.EXPORT_BATCH_SIZE
+            )
+            if not page.items:
+                return
+            memo_ids = {attachment.memo_id for attachment in page.items if attachment.memo_id}
+            result = await self.db.execute(select(Memo.id, Memo.uid).where(Memo.id.in_(memo_ids)))
+            memo_uids = dict(result.all())
+            yield [(attachment, memo_uids.get(attachment.memo_id)) for attachment in page.items]
+            self.db.expunge_all()
+            if page.next_cursor is None:
+                return
+            cursor = decode_cursor(page.next_cursor)
+    
+    async def export_ndjson(self, creator_id: int) -> AsyncIterator[str]:
+        async for records in self.iter_memo_records(creator_id):
+            yield "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+    
+    async def export_archive(self, creator_id: int, archive: ArchiveWriter) -> AsyncIterator[bytes]:
+        # Tar headers carry the member size up front, so the two listings are spooled
+        # (to disk once they outgrow EXPORT_SPOOL_MAX_BYTES) before being added.
+        now = time.time()
+        with tempfile.SpooledTemporaryFile(max_size=settings.EXPORT_SPOOL_MAX_BYTES) as spool:
+            async for lines in self.export_ndjson(creator_id):
+                spool.write(lines.encode())
+            size = spool.tell()
+            spool.seek(0)
+            async for chunk in archive.add_file("memos.ndjson", spool, size, now, compress=True):
+                yield chunk
+        
+        with tempfile.SpooledTemporaryFile(max_size=settings.EXPORT_SPOOL_MAX_BYTES) as spool:
+            async for attachments in self.iter_attachments(creator_id):
+                for attachment, memo_uid in attachments:
+                    record = {**self._attachment_record(attachment), "memo_uid": memo_uid}
+                    path = Path(attachment.reference) if attachment.storage_type == "local" and attachment.reference else None
+                    if path is not None and path.is_file():
+                        record["path"] = f"attachments/{attachment.uid}/{Path(attachment.filename).name or attachment.uid}"
+                        with open(path, "rb") as source:
+                            stat = os.fstat(source.fileno())
+                            async for chunk in archive.add_file(record["path"], source, stat.st_size, stat.st_mtime):
+                                yield chunk
+                    else:
+                        record["path"] = None
+                    spool.write((json.dumps(record, ensure_ascii=False) + "\n").encode())
+            size = spool.tell()
+            spool.seek(0)
+            async for chunk in archive.add_file("attachments.ndjson", spool, size, now, compress=True):
+                yield chunk
+        
+        yield archive.close()
+    
+    def _attachment_record(self, attachment: Attachment) -> dict:
+        return {
+            "uid": attachment.uid,
+            "filename": attachment.filename,
+            "file_type": attachment.file_type,
+            "file_size": attachment.file_size,
+            "created_ts": self._timestamp(attachment.created_ts),
+        }
+    
+    def _timestamp(self, value: Optional[datetime]) -> Optional[str]:
+        return value.isoformat() if value else None
 
 
 class ReactionService:
@@ -187,10 +783,7 @@ class ReactionService:
             memo_id=memo_id,
             reaction=reaction
         )
-        self.db.add(db_reaction)
-        await self.db.commit()
-        await self.db.refresh(db_reaction)
-        return db_reaction
+        return await add_and_commit(self.db, db_reaction)
     
     async def delete_reaction(self, reaction_id: int) -> bool:
         result = await self.db.execute(select(Reaction).where(Reaction.id == reaction_id))
@@ -217,13 +810,13 @@ class PersonalAccessTokenService:
         
         db_pat = PersonalAccessToken(
             user_id=user_id,
-            token=token,
+            token_hash=hash_pat_token(token),
+            token_hint=token[-4:],
             description=pat_data.description,
             expires_at=expires_at
         )
         self.db.add(db_pat)
         await self.db.commit()
-        await self.db.refresh(db_pat)
         return db_pat
     
     async def delete_pat(self, pat_id: int, user_id: int) -> bool:
@@ -235,6 +828,7 @@ class PersonalAccessTokenService:
         if pat:
             await self.db.delete(pat)
             await self.db.commit()
+            await pat_cache.invalidate(pat_id)
             return True
         return False
     
@@ -0,0 +1,53 @@
+"""memo full-text index
+
+Revision ID: 024ae8ca6275
+Revises: 21488a4e8a25
+Create Date: 2026-10-17 00:16:23.623809
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '024ae8ca6275'
+down_revision: Union[str, None] = '21488a4e8a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The DDL is spelled out here rather than taken from app.db.fulltext, so the revision
+# keeps producing the same schema however the application code changes.
+CREATE_STATEMENTS = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS memo_fts "
+        "USING fts5(content, content='memo', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        "INSERT INTO memo_fts(memo_fts) VALUES ('rebuild')",
+    ],
+    "postgresql": [
+        "CREATE INDEX IF NOT EXISTS ix_memo_content_fts "
+        "ON memo USING GIN (to_tsvector('simple', content))",
+    ],
+    "mysql": [
+        "CREATE FULLTEXT INDEX ft_memo_content ON memo (content)",
+    ],
+}
+
+DROP_STATEMENTS = {
+    "sqlite": ["DROP TABLE IF EXISTS memo_fts"],
+    "postgresql": ["DROP INDEX IF EXISTS ix_memo_content_fts"],
+    "mysql": ["DROP INDEX ft_memo_content ON memo"],
+}
+
+
+def upgrade() -> None:
+    for statement in CREATE_STATEMENTS.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in DROP_STATEMENTS.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
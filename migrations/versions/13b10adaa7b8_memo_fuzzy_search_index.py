@@ -0,0 +1,46 @@
+"""memo fuzzy search index
+
+Revision ID: 13b10adaa7b8
+Revises: da107f752528
+Create Date: 2026-10-17 00:22:21.659285
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '13b10adaa7b8'
+down_revision: Union[str, None] = 'da107f752528'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Only PostgreSQL keeps trigram indexes in the database; other dialects build the
+# fuzzy index in memory at startup.
+CREATE_STATEMENTS = {
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_memo_content_trgm ON memo USING GIN (content gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_memo_tag_tag_trgm ON memo_tag USING GIN (tag gin_trgm_ops)",
+    ],
+}
+
+DROP_STATEMENTS = {
+    "postgresql": [
+        "DROP INDEX IF EXISTS ix_memo_tag_tag_trgm",
+        "DROP INDEX IF EXISTS ix_memo_content_trgm",
+    ],
+}
+
+
+def upgrade() -> None:
+    for statement in CREATE_STATEMENTS.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in DROP_STATEMENTS.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
@@ -0,0 +1,168 @@
+"""initial schema
+
+Revision ID: 21488a4e8a25
+Revises: 
+Create Date: 2026-10-17 00:16:23.117674
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '21488a4e8a25'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("username", sa.String(length=100), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("nickname", sa.String(length=100), nullable=True),
+        sa.Column("password_hash", sa.String(length=255), nullable=False),
+        sa.Column("avatar_url", sa.String(length=500), nullable=True),
+        sa.Column("role", sa.Enum("HOST", "ADMIN", "USER", name="userrole"), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("created_ts", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_ts", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_user_id", "user", ["id"], unique=False)
+    op.create_index("ix_user_username", "user", ["username"], unique=True)
+    op.create_index("ix_user_email", "user", ["email"], unique=True)
+
+    op.create_table(
+        "instance_setting",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("key", sa.String(length=100), nullable=False),
+        sa.Column("value", sa.Text(), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("created_ts", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_ts", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_instance_setting_id", "instance_setting", ["id"], unique=False)
+    op.create_index("ix_instance_setting_key", "instance_setting", ["key"], unique=True)
+
+    op.create_table(
+        "memo",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("uid", sa.String(length=100), nullable=False),
+        sa.Column("creator_id", sa.Integer(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("visibility", sa.Enum("PUBLIC", "PROTECTED", "PRIVATE", name="memovisibility"), nullable=True),
+        sa.Column("tags", sa.JSON(), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=True),
+        sa.Column("pinned", sa.Boolean(), nullable=True),
+        sa.Column("created_ts", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_ts", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["creator_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_memo_id", "memo", ["id"], unique=False)
+    op.create_index("ix_memo_uid", "memo", ["uid"], unique=True)
+
+    op.create_table(
+        "personal_access_token",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("token", sa.String(length=255), nullable=False),
+        sa.Column("description", sa.String(length=500), nullable=True),
+        sa.Column("issued_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_personal_access_token_id", "personal_access_token", ["id"], unique=False)
+    op.create_index("ix_personal_access_token_token", "personal_access_token", ["token"], unique=True)
+
+    op.create_table(
+        "user_setting",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("key", sa.String(length=100), nullable=False),
+        sa.Column("value", sa.Text(), nullable=True),
+        sa.Column("created_ts", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_ts", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_user_setting_id", "user_setting", ["id"], unique=False)
+
+    op.create_table(
+        "attachment",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("uid", sa.String(length=100), nullable=False),
+        sa.Column("creator_id", sa.Integer(), nullable=False),
+        sa.Column("memo_id", sa.Integer(), nullable=True),
+        sa.Column("filename", sa.String(length=500), nullable=False),
+        sa.Column("file_type", sa.String(length=100), nullable=True),
+        sa.Column("file_size", sa.Integer(), nullable=True),
+        sa.Column("storage_type", sa.String(length=50), nullable=True),
+        sa.Column("reference", sa.String(length=1000), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=True),
+        sa.Column("created_ts", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_ts", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["creator_id"], ["user.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["memo_id"], ["memo.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_attachment_id", "attachment", ["id"], unique=False)
+    op.create_index("ix_attachment_uid", "attachment", ["uid"], unique=True)
+
+    op.create_table(
+        "memo_relation",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("memo_id", sa.Integer(), nullable=False),
+        sa.Column("related_memo_id", sa.Integer(), nullable=False),
+        sa.Column("type", sa.String(length=50), nullable=False),
+        sa.Column("created_ts", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["memo_id"], ["memo.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["related_memo_id"], ["memo.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_memo_relation_id", "memo_relation", ["id"], unique=False)
+
+    op.create_table(
+        "reaction",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("creator_id", sa.Integer(), nullable=False),
+        sa.Column("memo_id", sa.Integer(), nullable=False),
+        sa.Column("reaction", sa.String(length=50), nullable=False),
+        sa.Column("created_ts", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["creator_id"], ["user.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["memo_id"], ["memo.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_reaction_id", "reaction", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reaction_id", table_name="reaction")
+    op.drop_table("reaction")
+    op.drop_index("ix_memo_relation_id", table_name="memo_relation")
+    op.drop_table("memo_relation")
+    op.drop_index("ix_attachment_uid", table_name="attachment")
+    op.drop_index("ix_attachment_id", table_name="attachment")
+    op.drop_table("attachment")
+    op.drop_index("ix_user_setting_id", table_name="user_setting")
+    op.drop_table("user_setting")
+    op.drop_index("ix_personal_access_token_token", table_name="personal_access_token")
+    op.drop_index("ix_personal_access_token_id", table_name="personal_access_token")
+    op.drop_table("personal_access_token")
+    op.drop_index("ix_memo_uid", table_name="memo")
+    op.drop_index("ix_memo_id", table_name="memo")
+    op.drop_table("memo")
+    op.drop_index("ix_instance_setting_key", table_name="instance_setting")
+    op.drop_index("ix_instance_setting_id", table_name="instance_setting")
+    op.drop_table("instance_setting")
+    op.drop_index("ix_user_email", table_name="user")
+    op.drop_index("ix_user_username", table_name="user")
+    op.drop_index("ix_user_id", table_name="user")
+    op.drop_table("user")
@@ -0,0 +1,81 @@
+"""memo tag index
+
+Revision ID: 6aaab414fec9
+Revises: 024ae8ca6275
+Create Date: 2026-10-17 00:16:24.212482
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6aaab414fec9'
+down_revision: Union[str, None] = '024ae8ca6275'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 1000
+
+memo = sa.table(
+    "memo",
+    sa.column("id", sa.Integer),
+    sa.column("creator_id", sa.Integer),
+    sa.column("tags", sa.JSON),
+    sa.column("created_ts", sa.DateTime(timezone=True)),
+)
+
+memo_tag = sa.table(
+    "memo_tag",
+    sa.column("memo_id", sa.Integer),
+    sa.column("creator_id", sa.Integer),
+    sa.column("tag", sa.String),
+    sa.column("created_ts", sa.DateTime(timezone=True)),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "memo_tag",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("memo_id", sa.Integer(), nullable=False),
+        sa.Column("creator_id", sa.Integer(), nullable=False),
+        sa.Column("tag", sa.String(length=255), nullable=False),
+        sa.Column("created_ts", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["memo_id"], ["memo.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["creator_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("memo_id", "tag", name="uq_memo_tag_memo_tag"),
+    )
+    op.create_index("ix_memo_tag_id", "memo_tag", ["id"], unique=False)
+    op.create_index("ix_memo_tag_tag_creator_created", "memo_tag", ["tag", "creator_id", "created_ts"], unique=False)
+
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        memos = conn.execute(
+            sa.select(memo.c.id, memo.c.creator_id, memo.c.tags, memo.c.created_ts)
+            .where(memo.c.id > last_id)
+            .order_by(memo.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not memos:
+            break
+
+        rows = [
+            {"memo_id": memo_id, "creator_id": creator_id, "tag": tag, "created_ts": created_ts}
+            for memo_id, creator_id, tags, created_ts in memos
+            for tag in set(tags or [])
+        ]
+        if rows:
+            conn.execute(memo_tag.insert(), rows)
+        last_id = memos[-1].id
+
+
+def downgrade() -> None:
+    op.drop_index("ix_memo_tag_tag_creator_created", table_name="memo_tag")
+    op.drop_index("ix_memo_tag_id", table_name="memo_tag")
+    op.drop_table("memo_tag")
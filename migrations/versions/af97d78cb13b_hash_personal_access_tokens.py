@@ -0,0 +1,57 @@
+"""hash personal access tokens
+
+Revision ID: af97d78cb13b
+Revises: 13b10adaa7b8
+Create Date: 2026-10-17 00:31:48.207316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import hashlib
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'af97d78cb13b'
+down_revision: Union[str, None] = '13b10adaa7b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("personal_access_token", sa.Column("token_hash", sa.String(length=64), nullable=True))
+    op.add_column("personal_access_token", sa.Column("token_hint", sa.String(length=20), nullable=True))
+    
+    # Existing tokens keep working: their digests are computed from the stored plaintext,
+    # which is then dropped. They lack the memos_pat_ prefix, so get_current_user looks
+    # them up by digest because they are not shaped like JWTs.
+    pat = sa.table(
+        "personal_access_token",
+        sa.column("id", sa.Integer),
+        sa.column("token", sa.String),
+        sa.column("token_hash", sa.String),
+        sa.column("token_hint", sa.String),
+    )
+    bind = op.get_bind()
+    for pat_id, token in bind.execute(sa.select(pat.c.id, pat.c.token)).all():
+        bind.execute(
+            pat.update()
+            .where(pat.c.id == pat_id)
+            .values(token_hash=hashlib.sha256(token.encode()).hexdigest(), token_hint=token[-4:])
+        )
+    
+    op.drop_index("ix_personal_access_token_token", table_name="personal_access_token")
+    with op.batch_alter_table("personal_access_token") as batch_op:
+        batch_op.alter_column("token_hash", existing_type=sa.String(length=64), nullable=False)
+        batch_op.drop_column("token")
+    op.create_index("ix_personal_access_token_token_hash", "personal_access_token", ["token_hash"], unique=True)
+
+
+def downgrade() -> None:
+    # Plaintext tokens cannot be recovered, so every token is unusable after a downgrade.
+    op.drop_index("ix_personal_access_token_token_hash", table_name="personal_access_token")
+    with op.batch_alter_table("personal_access_token") as batch_op:
+        batch_op.alter_column("token_hash", existing_type=sa.String(length=64), new_column_name="token", type_=sa.String(length=255))
+        batch_op.drop_column("token_hint")
+    op.create_index("ix_personal_access_token_token", "personal_access_token", ["token"], unique=True)
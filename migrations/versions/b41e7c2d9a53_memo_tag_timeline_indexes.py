@@ -0,0 +1,34 @@
+"""memo tag timeline indexes
+
+Revision ID: b41e7c2d9a53
+Revises: c9039c9ef48c
+Create Date: 2026-10-17 01:20:11.408317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41e7c2d9a53'
+down_revision: Union[str, None] = 'c9039c9ef48c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tag timelines are read from memo_tag in (created_ts, memo_id) order, so both
+    # columns go in the index after the equality columns.
+    op.drop_index("ix_memo_tag_tag_creator_created", table_name="memo_tag")
+    op.create_index(
+        "ix_memo_tag_tag_creator_timeline", "memo_tag", ["tag", "creator_id", "created_ts", "memo_id"], unique=False
+    )
+    op.create_index("ix_memo_tag_tag_timeline", "memo_tag", ["tag", "created_ts", "memo_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_memo_tag_tag_timeline", table_name="memo_tag")
+    op.drop_index("ix_memo_tag_tag_creator_timeline", table_name="memo_tag")
+    op.create_index("ix_memo_tag_tag_creator_created", "memo_tag", ["tag", "creator_id", "created_ts"], unique=False)
@@ -0,0 +1,26 @@
+"""attachment creator index
+
+Revision ID: c9039c9ef48c
+Revises: af97d78cb13b
+Create Date: 2026-10-17 00:49:44.563309
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9039c9ef48c'
+down_revision: Union[str, None] = 'af97d78cb13b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_attachment_creator_id", "attachment", ["creator_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_attachment_creator_id", table_name="attachment")
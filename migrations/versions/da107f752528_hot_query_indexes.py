@@ -0,0 +1,40 @@
+"""hot query indexes
+
+Revision ID: da107f752528
+Revises: fed5b63c3815
+Create Date: 2026-10-17 00:16:25.324399
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'da107f752528'
+down_revision: Union[str, None] = 'fed5b63c3815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_memo_creator_created", "memo", ["creator_id", "created_ts"], unique=False)
+    op.create_index("ix_memo_visibility_created", "memo", ["visibility", "created_ts"], unique=False)
+    op.create_index("ix_attachment_memo_id", "attachment", ["memo_id"], unique=False)
+    op.create_index("ix_reaction_memo_id", "reaction", ["memo_id"], unique=False)
+    op.create_index("ix_memo_relation_memo_id", "memo_relation", ["memo_id"], unique=False)
+    op.create_index("ix_memo_relation_related_memo_id", "memo_relation", ["related_memo_id"], unique=False)
+    op.create_index("ix_personal_access_token_user_id", "personal_access_token", ["user_id"], unique=False)
+    op.create_index("ix_user_setting_user_id", "user_setting", ["user_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_setting_user_id", table_name="user_setting")
+    op.drop_index("ix_personal_access_token_user_id", table_name="personal_access_token")
+    op.drop_index("ix_memo_relation_related_memo_id", table_name="memo_relation")
+    op.drop_index("ix_memo_relation_memo_id", table_name="memo_relation")
+    op.drop_index("ix_reaction_memo_id", table_name="reaction")
+    op.drop_index("ix_attachment_memo_id", table_name="attachment")
+    op.drop_index("ix_memo_visibility_created", table_name="memo")
+    op.drop_index("ix_memo_creator_created", table_name="memo")
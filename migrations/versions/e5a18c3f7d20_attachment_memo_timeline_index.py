@@ -0,0 +1,30 @@
+"""attachment memo timeline index
+
+Revision ID: e5a18c3f7d20
+Revises: b41e7c2d9a53
+Create Date: 2026-10-17 01:41:52.730164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a18c3f7d20'
+down_revision: Union[str, None] = 'b41e7c2d9a53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A memo's attachments are paged newest first, so created_ts follows memo_id in the
+    # index and pages come off it without a sort.
+    op.drop_index("ix_attachment_memo_id", table_name="attachment")
+    op.create_index("ix_attachment_memo_created", "attachment", ["memo_id", "created_ts"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_attachment_memo_created", table_name="attachment")
+    op.create_index("ix_attachment_memo_id", "attachment", ["memo_id"], unique=False)
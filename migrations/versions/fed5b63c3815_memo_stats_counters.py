@@ -0,0 +1,106 @@
+"""memo stats counters
+
+Revision ID: fed5b63c3815
+Revises: 6aaab414fec9
+Create Date: 2026-10-17 00:16:24.783486
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fed5b63c3815'
+down_revision: Union[str, None] = '6aaab414fec9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+memo = sa.table(
+    "memo",
+    sa.column("id", sa.Integer),
+    sa.column("creator_id", sa.Integer),
+    sa.column("visibility", sa.String),
+    sa.column("pinned", sa.Boolean),
+)
+
+memo_tag = sa.table(
+    "memo_tag",
+    sa.column("id", sa.Integer),
+    sa.column("creator_id", sa.Integer),
+    sa.column("tag", sa.String),
+)
+
+
+def count_where(condition):
+    return sa.func.coalesce(sa.func.sum(sa.case((condition, 1), else_=0)), 0)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_memo_stats",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("memo_count", sa.Integer(), nullable=False),
+        sa.Column("pinned_count", sa.Integer(), nullable=False),
+        sa.Column("public_count", sa.Integer(), nullable=False),
+        sa.Column("protected_count", sa.Integer(), nullable=False),
+        sa.Column("private_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id"),
+    )
+    op.create_index("ix_user_memo_stats_id", "user_memo_stats", ["id"], unique=False)
+    
+    op.create_table(
+        "user_tag_count",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("tag", sa.String(length=255), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "tag", name="uq_user_tag_count_user_tag"),
+    )
+    op.create_index("ix_user_tag_count_id", "user_tag_count", ["id"], unique=False)
+    
+    user_memo_stats = sa.table(
+        "user_memo_stats",
+        sa.column("user_id"),
+        sa.column("memo_count"),
+        sa.column("pinned_count"),
+        sa.column("public_count"),
+        sa.column("protected_count"),
+        sa.column("private_count"),
+    )
+    op.execute(
+        user_memo_stats.insert().from_select(
+            ["user_id", "memo_count", "pinned_count", "public_count", "protected_count", "private_count"],
+            sa.select(
+                memo.c.creator_id,
+                sa.func.count(memo.c.id),
+                count_where(memo.c.pinned == sa.true()),
+                count_where(memo.c.visibility == "PUBLIC"),
+                count_where(memo.c.visibility == "PROTECTED"),
+                count_where(sa.or_(memo.c.visibility == "PRIVATE", memo.c.visibility.is_(None))),
+            ).group_by(memo.c.creator_id)
+        )
+    )
+    
+    user_tag_count = sa.table("user_tag_count", sa.column("user_id"), sa.column("tag"), sa.column("count"))
+    op.execute(
+        user_tag_count.insert().from_select(
+            ["user_id", "tag", "count"],
+            sa.select(memo_tag.c.creator_id, memo_tag.c.tag, sa.func.count(memo_tag.c.id))
+            .group_by(memo_tag.c.creator_id, memo_tag.c.tag)
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_tag_count_id", table_name="user_tag_count")
+    op.drop_table("user_tag_count")
+    op.drop_index("ix_user_memo_stats_id", table_name="user_memo_stats")
+    op.drop_table("user_memo_stats")
@@ -0,0 +1,41 @@
+import sys
+import os
+import argparse
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.security import create_access_token, decode_access_token, token_cache
+
+
+def run(tokens: list, requests: int, cached: bool) -> float:
+    token_cache.enabled = cached
+    token_cache.entries.clear()
+    token_cache.hits = token_cache.misses = 0
+    rng = random.Random(0)
+    
+    started = time.process_time()
+    for _ in range(requests):
+        if decode_access_token(rng.choice(tokens)) is None:
+            raise RuntimeError("Token failed to decode")
+    return time.process_time() - started
+
+
+def bench_auth(clients: int, requests: int):
+    tokens = [create_access_token(data={"sub": str(i)}) for i in range(1, clients + 1)]
+    
+    print(f"{requests} requests from {clients} clients")
+    uncached = run(tokens, requests, cached=False)
+    print(f"  without cache: {uncached * 1e6 / requests:8.1f} us/request")
+    cached = run(tokens, requests, cached=True)
+    print(f"  with cache:    {cached * 1e6 / requests:8.1f} us/request (hit rate {token_cache.stats()['hit_rate']:.1%})")
+    print(f"  speedup:       {uncached / cached:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-request JWT verification CPU with and without the token cache.")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=50000)
+    args = parser.parse_args()
+    bench_auth(args.clients, args.requests)
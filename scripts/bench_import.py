@@ -0,0 +1,98 @@
+import sys
+import os
+import argparse
+import json
+import random
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_import.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import func, select
+from app.db.models import Memo
+from app.db.session import AsyncSessionLocal, dispose_engines
+from app.core.jsonstream import iter_ndjson
+from app.core.render_pool import render_pool
+from app.schemas.schemas import MemoCreate, UserCreate
+from app.services.services import UserService, MemoService
+from app.config import settings
+import asyncio
+
+WORDS = ["memo", "note", "idea", "todo", "meeting", "draft", "review", "plan", "release", "bug"]
+
+
+def migrate():
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+    command.upgrade(config, "head")
+
+
+def generate(count: int, prefix: str) -> list:
+    rng = random.Random(0)
+    items = []
+    for i in range(count):
+        words = " ".join(rng.choice(WORDS) for _ in range(20))
+        item = {
+            "uid": f"{prefix}-{i}",
+            "content": f"{words} #{rng.choice(WORDS)}",
+            "tags": [rng.choice(WORDS)],
+            "created_ts": f"2024-01-01T00:00:{i % 60:02d}Z",
+        }
+        if i:
+            item["relations"] = [{"related_uid": f"{prefix}-{i - 1}"}]
+        items.append(item)
+    return items
+
+
+async def stream(body: bytes, chunk_size: int = 65536):
+    for start in range(0, len(body), chunk_size):
+        yield body[start:start + chunk_size]
+
+
+async def bench_import(count: int, single: int):
+    async with AsyncSessionLocal() as db:
+        user = await UserService(db).create_user(
+            UserCreate(username="bench", email="bench@example.com", password="password"),
+            "hash"
+        )
+    
+    print(f"Importing {count} memos (chunks of {settings.IMPORT_CHUNK_SIZE})")
+    async with AsyncSessionLocal() as db:
+        memo_service = MemoService(db)
+        started = time.perf_counter()
+        for item in generate(single, "single"):
+            await memo_service.create_memo(MemoCreate(content=item["content"], tags=item["tags"]), user.id)
+        elapsed = time.perf_counter() - started
+        per_memo = single / elapsed
+        print(f"  POST /memos one by one: {per_memo:10.0f} memos/s ({single} memos)")
+    
+    body = "\n".join(json.dumps(item) for item in generate(count, "bulk")).encode()
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        summary = await MemoService(db).import_memos(iter_ndjson(stream(body)), user.id)
+        elapsed = time.perf_counter() - started
+        bulk = summary["imported"] / elapsed
+        print(f"  NDJSON import:          {bulk:10.0f} memos/s ({summary['imported']} memos, {summary['relations']} relations, {summary['failed']} failed)")
+        print(f"  speedup:                {bulk / per_memo:10.1f}x")
+        
+        total = (await db.execute(select(func.count(Memo.id)))).scalar()
+        if total != single + count:
+            raise RuntimeError(f"Expected {single + count} memos, found {total}")
+    
+    render_pool.shutdown()
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare memo import throughput with one-by-one creation.")
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--single", type=int, default=1000)
+    args = parser.parse_args()
+    migrate()
+    asyncio.run(bench_import(args.count, args.single))
@@ -0,0 +1,92 @@
+import sys
+import os
+import argparse
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "group_commit.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ["GROUP_COMMIT_ENABLED"] = "true"
+os.environ["USER_CACHE_ENABLED"] = "false"
+os.environ.setdefault("DB_POOL_TIMEOUT", "3")
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import func, select
+from app.db.models import Memo, Attachment, Reaction
+from app.db.session import AsyncSessionLocal, dispose_engines
+from app.db.writer import group_writer
+from app.core.deps import load_user
+from app.core.render_pool import render_pool
+from app.schemas.schemas import MemoCreate, UserCreate
+from app.services.services import UserService, MemoService, AttachmentService, ReactionService
+from app.config import settings
+import asyncio
+
+
+def migrate():
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+    command.upgrade(config, "head")
+
+
+async def write(kind: str, i: int, user_id: int, memo_id: int):
+    # Like a request with a cold user cache: the session checks out a connection to
+    # load the user before it hands its insert to the writer.
+    async with AsyncSessionLocal() as db:
+        await load_user(db, user_id)
+        if kind == "memo":
+            await MemoService(db).create_memo(MemoCreate(content=f"burst memo {i}"), user_id)
+        elif kind == "attachment":
+            await AttachmentService(db).create_attachment(
+                filename=f"burst-{i}.txt", file_type="text/plain", file_size=0,
+                creator_id=user_id, memo_id=memo_id, storage_type="LOCAL", reference=None
+            )
+        else:
+            await ReactionService(db).create_reaction(memo_id, f"r{i}", user_id)
+
+
+async def check_burst(size: int) -> int:
+    async with AsyncSessionLocal() as db:
+        user = await UserService(db).create_user(
+            UserCreate(username="burst", email="burst@example.com", password="password"),
+            "hash"
+        )
+        memo = await MemoService(db).create_memo(MemoCreate(content="target"), user.id)
+    
+    pool_capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    print(f"Burst of {size} concurrent writes per kind (pool capacity {pool_capacity}, timeout {settings.DB_POOL_TIMEOUT}s)")
+    failed = 0
+    for kind, model in (("memo", Memo), ("attachment", Attachment), ("reaction", Reaction)):
+        results = await asyncio.gather(
+            *[write(kind, i, user.id, memo.id) for i in range(size)],
+            return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        async with AsyncSessionLocal() as db:
+            count = (await db.execute(select(func.count(model.id)))).scalar()
+        print(f"  {kind:10} {size - len(errors):4}/{size} succeeded, {count} rows")
+        for error in errors[:3]:
+            print(f"    {type(error).__name__}: {error}")
+        failed += len(errors)
+    
+    print(f"  writer: {group_writer.stats()}")
+    await group_writer.stop()
+    render_pool.shutdown()
+    await dispose_engines()
+    
+    if failed:
+        print(f"\n{failed} writes failed.")
+        return 1
+    print("\nAll writes committed.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that group commit survives a burst of writes with a cold user cache.")
+    parser.add_argument("--size", type=int, default=40)
+    args = parser.parse_args()
+    migrate()
+    sys.exit(asyncio.run(check_burst(args.size)))
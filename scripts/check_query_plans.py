@@ -0,0 +1,124 @@
+import sys
+import os
+import re
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "query_plans.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from app.db.models import MemoRelation
+from app.schemas.schemas import MemoCreate, UserCreate
+from app.services.services import (
+    UserService, MemoService, MemoStatsService, AttachmentService, ReactionService, PersonalAccessTokenService,
+    ExportService
+)
+from app.api.v1.search import SearchService
+import asyncio
+import sqlite3
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+TEMP_SORT = re.compile(r"^USE TEMP B-TREE FOR .*ORDER BY$")
+LIMIT = re.compile(r"\bLIMIT\b")
+
+
+def migrate():
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+    command.upgrade(config, "head")
+
+
+async def seed(db: AsyncSession):
+    user_service = UserService(db)
+    memo_service = MemoService(db)
+    for i in range(2):
+        user = await user_service.create_user(
+            UserCreate(username=f"user{i}", email=f"user{i}@example.com", password="password"),
+            "hash"
+        )
+        for j in range(20):
+            await memo_service.create_memo(
+                MemoCreate(content=f"memo {j} of user {i}", tags=[f"tag{j % 3}"], pinned=j % 5 == 0),
+                user.id
+            )
+
+
+async def hot_queries(db: AsyncSession):
+    memo_service = MemoService(db)
+    search_service = SearchService(db)
+    
+    yield "timeline", memo_service.list_memos(creator_id=1, viewer_id=1, limit=20)
+    yield "public timeline", memo_service.list_memos(viewer_id=None, limit=20)
+    yield "tag timeline", memo_service.list_memos(creator_id=1, tag="tag1", viewer_id=1, limit=20)
+    yield "public tag timeline", memo_service.list_memos(tag="tag1", viewer_id=None, limit=20)
+    yield "tag filter", search_service.filter_memos(creator_id=1, tag="tag1", viewer_id=1, limit=20)
+    yield "pinned filter", search_service.filter_memos(creator_id=1, pinned=True, viewer_id=1, limit=20)
+    yield "memo attachments", AttachmentService(db).list_attachments(memo_id=1)
+    yield "memo reactions", ReactionService(db).list_reactions(1)
+    yield "memo relations", db.execute(select(MemoRelation).where(MemoRelation.memo_id == 1))
+    yield "related memos", db.execute(select(MemoRelation).where(MemoRelation.related_memo_id == 1))
+    yield "tags", MemoStatsService(db).get_tags(1)
+    yield "stats", MemoStatsService(db).get_stats(1)
+    yield "tokens", PersonalAccessTokenService(db).list_pats(1)
+    yield "memo export", anext(ExportService(db).iter_memo_records(1), None)
+    yield "attachment export", anext(ExportService(db).iter_attachments(1), None)
+
+
+async def capture_statements() -> list:
+    engine = create_async_engine(os.environ["DATABASE_URL"])
+    captured = []
+    
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        await seed(db)
+        
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                captured[-1][1].append((statement, parameters))
+        
+        async for name, awaitable in hot_queries(db):
+            captured.append((name, []))
+            await awaitable
+    
+    await engine.dispose()
+    return captured
+
+
+def main() -> int:
+    migrate()
+    captured = asyncio.run(capture_statements())
+    
+    conn = sqlite3.connect(DB_PATH)
+    failures = []
+    for name, statements in captured:
+        for statement, parameters in statements:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            scans = [detail for detail in plan if FULL_SCAN.match(detail)]
+            # A paginated query that sorts in a temp B-tree reads and sorts every matching
+            # row to return one page, which is as bad as a full scan on deep pages.
+            if LIMIT.search(statement):
+                scans += [detail for detail in plan if TEMP_SORT.match(detail)]
+            status = "FAIL" if scans else "ok"
+            print(f"[{status}] {name}: {' | '.join(plan)}")
+            if scans:
+                failures.append((name, statement, scans))
+    conn.close()
+    
+    if failures:
+        print(f"\n{len(failures)} hot queries fall back to full table scans or sorts:")
+        for name, statement, scans in failures:
+            print(f"- {name}: {', '.join(scans)}\n  {' '.join(statement.split())}")
+        return 1
+    
+    print("\nAll hot queries use an index.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,19 @@
-from sqlalchemy.ext.asyncio import create_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from app.db.base import Base
-from app.config import settings
-import asyncio
+import sys
+import os
 
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
 
-async def init_db():
-    engine = create_engine(
-        settings.DATABASE_URL.replace("+aiosqlite", ""),
-        echo=settings.DEBUG
-    )
-    
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully!")
+from alembic import command
+from alembic.config import Config
+
+
+def init_db():
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+    command.upgrade(config, "head")
+    print("Database migrated to the latest revision successfully!")
 
 
 if __name__ == "__main__":
-    asyncio.run(init_db())
+    init_db()
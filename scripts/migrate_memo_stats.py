@@ -0,0 +1,53 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, insert, delete, func, case, or_
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.db.models import Memo, MemoTag, MemoVisibility, UserMemoStats, UserTagCount
+from app.config import settings
+import asyncio
+
+
+def count_where(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+async def migrate_memo_stats():
+    engine = create_async_engine(settings.DATABASE_URL, echo=settings.DEBUG)
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(UserMemoStats.__table__.create, checkfirst=True)
+        await conn.run_sync(UserTagCount.__table__.create, checkfirst=True)
+        await conn.execute(delete(UserMemoStats))
+        await conn.execute(delete(UserTagCount))
+        
+        await conn.execute(
+            insert(UserMemoStats).from_select(
+                ["user_id", "memo_count", "pinned_count", "public_count", "protected_count", "private_count"],
+                select(
+                    Memo.creator_id,
+                    func.count(Memo.id),
+                    count_where(Memo.pinned == True),
+                    count_where(Memo.visibility == MemoVisibility.PUBLIC),
+                    count_where(Memo.visibility == MemoVisibility.PROTECTED),
+                    count_where(or_(Memo.visibility == MemoVisibility.PRIVATE, Memo.visibility.is_(None)))
+                ).group_by(Memo.creator_id)
+            )
+        )
+        
+        await conn.execute(
+            insert(UserTagCount).from_select(
+                ["user_id", "tag", "count"],
+                select(MemoTag.creator_id, MemoTag.tag, func.count(MemoTag.id))
+                .group_by(MemoTag.creator_id, MemoTag.tag)
+            )
+        )
+    
+    await engine.dispose()
+    print("Memo stats and tag counts backfilled successfully!")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate_memo_stats())
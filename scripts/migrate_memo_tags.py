@@ -0,0 +1,51 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, insert, delete
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.db.models import Memo, MemoTag
+from app.config import settings
+import asyncio
+
+BATCH_SIZE = 1000
+
+
+async def migrate_memo_tags():
+    engine = create_async_engine(settings.DATABASE_URL, echo=settings.DEBUG)
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(MemoTag.__table__.create, checkfirst=True)
+        await conn.execute(delete(MemoTag))
+        
+        last_id = 0
+        total = 0
+        while True:
+            result = await conn.execute(
+                select(Memo.id, Memo.creator_id, Memo.tags, Memo.created_ts)
+                .where(Memo.id > last_id)
+                .order_by(Memo.id)
+                .limit(BATCH_SIZE)
+            )
+            memos = result.all()
+            if not memos:
+                break
+            
+            rows = [
+                {"memo_id": memo_id, "creator_id": creator_id, "tag": tag, "created_ts": created_ts}
+                for memo_id, creator_id, tags, created_ts in memos
+                for tag in set(tags or [])
+            ]
+            if rows:
+                await conn.execute(insert(MemoTag), rows)
+            
+            total += len(rows)
+            last_id = memos[-1].id
+    
+    await engine.dispose()
+    print(f"Backfilled {total} memo tags successfully!")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate_memo_tags())
@@ -0,0 +1,30 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.db.fulltext import fulltext_index
+from app.db.trigram import fuzzy_index
+from app.config import settings
+import asyncio
+
+
+async def rebuild_search_index():
+    engine = create_async_engine(settings.DATABASE_URL, echo=settings.DEBUG)
+    
+    async with engine.begin() as conn:
+        await fulltext_index.create(conn)
+        await fulltext_index.rebuild(conn)
+    
+    fuzzy_path = fuzzy_index.index_path(engine)
+    if fuzzy_path and os.path.exists(fuzzy_path):
+        os.remove(fuzzy_path)
+    await fuzzy_index.load(engine)
+    
+    await engine.dispose()
+    print("Full-text and fuzzy search indexes rebuilt successfully!")
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_search_index())
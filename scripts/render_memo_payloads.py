@@ -0,0 +1,60 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.db.models import Memo
+from app.core.markdown import markdown_renderer
+from app.core.render_pool import render_pool
+from app.config import settings
+import asyncio
+
+BATCH_SIZE = 1000
+
+
+async def render_memo_payloads():
+    # Stores the rendered HTML of memos written before the render cache existed, or under
+    # different Markdown settings, so reads can serve it without rendering.
+    engine = create_async_engine(settings.DATABASE_URL, echo=settings.DEBUG)
+    
+    last_id = 0
+    total = 0
+    while True:
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                select(Memo.id, Memo.content, Memo.payload)
+                .where(Memo.id > last_id)
+                .order_by(Memo.id)
+                .limit(BATCH_SIZE)
+            )
+            memos = result.all()
+            if not memos:
+                break
+            
+            stale = [memo for memo in memos if markdown_renderer.cached_payload(memo.payload, memo.content) is None]
+            payloads = render_pool.render_many([memo.content for memo in stale])
+            rows = []
+            for memo in stale:
+                payload = await payloads.__anext__()
+                rows.append({"memo_id": memo.id, "payload": {**(memo.payload or {}), **payload}})
+            if rows:
+                # Storing the render cache is not an edit, so updated_ts keeps its value.
+                await conn.execute(
+                    update(Memo.__table__)
+                    .where(Memo.__table__.c.id == bindparam("memo_id"))
+                    .values(payload=bindparam("payload"), updated_ts=Memo.__table__.c.updated_ts),
+                    rows
+                )
+            
+            total += len(rows)
+            last_id = memos[-1].id
+    
+    render_pool.shutdown()
+    await engine.dispose()
+    print(f"Rendered {total} memo payloads successfully!")
+
+
+if __name__ == "__main__":
+    asyncio.run(render_memo_payloads())